@@ -1,30 +1,41 @@
 # fix in future: audio needs to be properly transcoded pre-saving from mp4 to mp3 & sort_download() needs to first parse what filesize a image is before trying to add pyexvi2 metadata to it
-import requests, os, re, base64, hashlib, imagehash, io, traceback, sys, platform, subprocess, concurrent.futures, json, m3u8, av, time, mimetypes, configparser
-from random import randint, uniform
-from tkinter import Tk, filedialog
+import time
+startup_clock = time.perf_counter() # for --startup-timings
+import requests, os, re, asyncio, base64, hashlib, traceback, sys, platform, subprocess, concurrent.futures, json, configparser, threading, shutil, tempfile, heapq
+from random import randint
 from loguru import logger as log
 from functools import partialmethod
-from PIL import Image, ImageFile
+from contextlib import contextmanager
 from time import sleep as s
 from rich.table import Column
 from rich.progress import Progress, BarColumn, TextColumn
 from configparser import RawConfigParser
 from os.path import join, exists
 from os import makedirs, getcwd
-from utils.update_util import delete_deprecated_files, check_latest_release, apply_old_config_values
+from utils.update_util import delete_deprecated_files, check_latest_release, apply_old_config_values, http_cache
 from utils.metadata_manager import MetadataManager
+from utils.metadata_service import metadata_service
+from utils.rate_limiter import RateLimiter, RateLimitedSession
+from utils.dedup_index import DedupIndex
+from utils.scan_util import LibraryScanner, quick_fingerprint, md5_file, Image, imagehash
+from utils.stream_util import SegmentStream
+from utils.playlist_cache import PlaylistCache
+from utils.prefetch_util import CursorPrefetcher
+from utils.pipeline_util import StagePipeline
+from utils.checkpoint_util import PaginationCheckpoint
+from utils.async_engine import AsyncEngine, EngineSession, aiohttp
+from utils.phash_index import PhashIndex
+from utils.manifest_util import manifest_for
+from utils.lazy_import import LazyModule, import_timings
 import xml.etree.ElementTree as ET
-from ffmpeg import FFmpeg
 
-# tell PIL to be tolerant of files that are truncated
-ImageFile.LOAD_TRUNCATED_IMAGES = True
-
-# turn off for our purpose unnecessary PIL safety features
-Image.MAX_IMAGE_PIXELS = None
-
-# define requests session
-sess = requests.Session()
+# heavy dependencies are only imported on first use; e.g. a run that doesn't download any video never imports av
+# PIL.Image & imagehash are shared with the library scanner, which configures PIL on import
+m3u8 = LazyModule('m3u8')
+av = LazyModule('av')
 
+# time spent on the eager imports above; lazily imported modules add their own entries to import_timings, once they're used
+startup_import_seconds = time.perf_counter() - startup_clock
 
 # cross-platform compatible, re-name downloaders terminal output window title
 def set_window_title(title):
@@ -39,15 +50,17 @@ set_window_title('Fansly Downloader')
 print(base64.b64decode('CiAg4paI4paI4paI4paI4paI4paI4paI4pWXIOKWiOKWiOKWiOKWiOKWiOKVlyDilojilojilojilZcgICDilojilojilZfilojilojilojilojilojilojilojilZfilojilojilZcgIOKWiOKWiOKVlyAgIOKWiOKWiOKVlyAgICDilojilojilojilojilojilojilZcg4paI4paI4pWXICAgICAgICAgIOKWiOKWiOKWiOKWiOKWiOKVlyDilojilojilojilojilojilojilZcg4paI4paI4paI4paI4paI4paI4pWXIAogIOKWiOKWiOKVlOKVkOKVkOKVkOKVkOKVneKWiOKWiOKVlOKVkOKVkOKWiOKWiOKVl+KWiOKWiOKWiOKWiOKVlyAg4paI4paI4pWR4paI4paI4pWU4pWQ4pWQ4pWQ4pWQ4pWd4paI4paI4pWRICDilZrilojilojilZcg4paI4paI4pWU4pWdICAgIOKWiOKWiOKVlOKVkOKVkOKWiOKWiOKVl+KWiOKWiOKVkSAgICAgICAgIOKWiOKWiOKVlOKVkOKVkOKWiOKWiOKVl+KWiOKWiOKVlOKVkOKVkOKWiOKWiOKVl+KWiOKWiOKVlOKVkOKVkOKWiOKWiOKVlwogIOKWiOKWiOKWiOKWiOKWiOKVlyAg4paI4paI4paI4paI4paI4paI4paI4pWR4paI4paI4pWU4paI4paI4pWXIOKWiOKWiOKVkeKWiOKWiOKWiOKWiOKWiOKWiOKWiOKVl+KWiOKWiOKVkSAgIOKVmuKWiOKWiOKWiOKWiOKVlOKVnSAgICAg4paI4paI4pWRICDilojilojilZHilojilojilZEgICAgICAgICDilojilojilojilojilojilojilojilZHilojilojilojilojilojilojilZTilZ3ilojilojilojilojilojilojilZTilZ0KICDilojilojilZTilZDilZDilZ0gIOKWiOKWiOKVlOKVkOKVkOKWiOKWiOKVkeKWiOKWiOKVkeKVmuKWiOKWiOKVl+KWiOKWiOKVkeKVmuKVkOKVkOKVkOKVkOKWiOKWiOKVkeKWiOKWiOKVkSAgICDilZrilojilojilZTilZ0gICAgICDilojilojilZEgIOKWiOKWiOKVkeKWiOKWiOKVkSAgICAgICAgIOKWiOKWiOKVlOKVkOKVkOKWiOKWiOKVkeKWiOKWiOKVlOKVkOKVkOKVkOKVnSDilojilojilZTilZDilZDilZDilZ0gCiAg4paI4paI4pWRICAgICDilojilojilZEgIOKWiOKWiOKVkeKWiOKWiOKVkSDilZrilojilojilojilojilZHilojilojilojilojilojilojilojilZHilojilojilojilojilojilojilojilZfilojilojilZEgICAgICAg4paI4paI4paI4paI4paI4paI4pWU4pWd4paI4paI4paI4paI4paI4paI4paI4pWXICAgIOKWiOKWiOKVkSAg4paI4paI4pWR4paI4paI4pWRICAgICDilojilojilZEgICAgIAogIOKVmuKVkOKVnSAgICAg4pWa4pWQ4pWdICDilZrilZDilZ3ilZrilZDilZ0gIOKVmuKVkOKVkOKVkOKVneKVmuKVkOKVkOKVkOKVkOKVkOKVkOKVneKVmuKVkOKVkOKVkOKVkOKVkOKVkOKVneKVmuKVkOKVnSAgICAgICDilZrilZDilZDilZDilZDilZDilZ0g4pWa4pWQ4pWQ4pWQ4pWQ4pWQ4pWQ4pWdICAgIOKVmuKVkOKVnSAg4pWa4pWQ4pWd4pWa4pWQ4pWdICAgICDilZrilZDilZ0gICAgIAogICAgICAgICAgICAgICAgICAgICAgICBkZXZlbG9wZWQgYnkgZ2l0aHViLmNvbS9Bdm5zeC9mYW5zbHktZG93bmxvYWRlcgogICAgICAgICAgICAgIGZvcmtlZCAmIHN1cHBvcnRlciBvbiBnaXRodWIuY29tL1JhbGtleU9mZmljaWFsL2ZhbnNseS1kb3dubG9hZGVy').decode('utf-8'))
 
 # most of the time, we utilize this to display colored output rather than logging or prints
+output_lock = threading.Lock() # output re-configures the logger on every call, so download workers have to take turns
 def output(level: int, log_type: str, color: str, mytext: str):
-    try:
-        log.level(log_type, no = level, color = color)
-    except TypeError:
-        pass # level failsafe
-    log.__class__.type = partialmethod(log.__class__.log, log_type)
-    log.remove()
-    log.add(sys.stdout, format = "<level>{level}</level> | <white>{time:HH:mm}</white> <level>|</level><light-white>| {message}</light-white>", level=log_type)
-    log.type(mytext)
+    with output_lock:
+        try:
+            log.level(log_type, no = level, color = color)
+        except TypeError:
+            pass # level failsafe
+        log.__class__.type = partialmethod(log.__class__.log, log_type)
+        log.remove()
+        log.add(sys.stdout, format = "<level>{level}</level> | <white>{time:HH:mm}</white> <level>|</level><light-white>| {message}</light-white>", level=log_type)
+        log.type(mytext)
 
 # mostly used to attempt to open fansly downloaders documentation
 def open_url(url_to_open: str):
@@ -68,6 +81,9 @@ if len(config.read(config_path)) != 1:
 
 
 ## starting here: self updating functionality
+# if started with --unattended start argument; skip the update check & stargazing reminder and don't wait for any other non-essential web request
+unattended = '--unattended' in sys.argv
+
 # if started with --update start argument
 if len(sys.argv) > 1 and sys.argv[1] == '--update':
     # config.ini backwards compatibility fix (≤ v0.4) -> fix spelling mistake "seperate" to "separate"
@@ -102,7 +118,7 @@ if len(sys.argv) > 1 and sys.argv[1] == '--update':
 
     # read the config.ini file for a last time
     config.read(config_path)
-else:
+elif not unattended:
     # check if a new version is available
     check_latest_release(current_version = config.get('Other', 'version'), intend = 'check')
 
@@ -110,7 +126,7 @@ else:
 ## read & verify config values
 try:
     # TargetedCreator
-    config_username = config.get('TargetedCreator', 'Username') # string
+    config_username = config.get('TargetedCreator', 'Username') # string; a comma separated list of usernames enables batch mode
 
     # MyAccount
     config_token = config.get('MyAccount', 'Authorization_Token') # string
@@ -127,6 +143,26 @@ try:
     utilise_duplicate_threshold = config.getboolean('Options', 'utilise_duplicate_threshold') # True, False -> boolean
     download_directory = config.get('Options', 'download_directory') # Local_directory, C:\MyCustomFolderFilePath -> str
     metadata_handling = config.get('Options', 'metadata_handling').capitalize() # Advanced, Simple -> str
+    utilise_dedup_index = config.getboolean('Options', 'utilise_dedup_index', fallback = True) # True, False -> boolean
+    incremental_rescan = config.getboolean('Options', 'incremental_rescan', fallback = True) # True, False -> boolean
+    folder_manifest = config.getboolean('Options', 'folder_manifest', fallback = False) # True, False -> boolean
+    scan_workers = max(0, config.getint('Options', 'scan_workers', fallback = 0)) # 0 (one per cpu core) -> int
+    download_workers = max(1, config.getint('Options', 'download_workers', fallback = 4)) # 4 -> int
+    segment_workers = max(1, config.getint('Options', 'segment_workers', fallback = 8)) # 8 -> int
+    segment_retries = max(0, config.getint('Options', 'segment_retries', fallback = 5)) # 5 -> int
+    api_requests_per_minute = max(1, config.getfloat('Options', 'api_requests_per_minute', fallback = 30)) # 30 -> float
+    cdn_requests_per_minute = max(1, config.getfloat('Options', 'cdn_requests_per_minute', fallback = 1200)) # 1200 -> float
+    hash_workers = max(1, config.getint('Options', 'hash_workers', fallback = 2)) # 2 -> int
+    write_workers = max(1, config.getint('Options', 'write_workers', fallback = 1)) # 1 -> int
+    tag_workers = max(1, config.getint('Options', 'tag_workers', fallback = 2)) # 2 -> int
+    pipeline_queue_depth = max(1, config.getint('Options', 'pipeline_queue_depth', fallback = 8)) # 8 -> int
+    timeline_prefetch_depth = max(1, config.getint('Options', 'timeline_prefetch_depth', fallback = 2)) # 2 -> int
+    resume_downloads = config.getboolean('Options', 'resume_downloads', fallback = False) # True, False -> boolean
+    batch_creator_workers = max(1, config.getint('Options', 'batch_creator_workers', fallback = 2)) # 2 -> int
+    network_engine = config.get('Options', 'network_engine', fallback = 'Threads').capitalize() # Threads, Asyncio -> str
+    network_concurrency = max(1, config.getint('Options', 'network_concurrency', fallback = 64)) # 64 -> int
+    # above 0, images within that many bits of an existing pHash are declined as well; e.g. 8 catches re-compressed re-uploads, but can also decline similar burst shots of a set
+    photo_hash_distance = max(0, config.getint('Options', 'photo_hash_distance', fallback = 0)) # 0 (exact matches only) -> int
 
     # Other
     current_version = config.get('Other', 'version') # str
@@ -161,6 +197,31 @@ except (KeyError, NameError) as key:
 set_window_title(f"Fansly Downloader v{current_version}")
 
 
+# every request is paced per endpoint class & backs off on fansly's rate-limit (introduced in late august 2023)
+rate_limiter = RateLimiter(api_requests_per_minute, cdn_requests_per_minute)
+
+if network_engine == 'Asyncio' and aiohttp is None:
+    output(3,'\n WARNING','<yellow>', f"network_engine \'Asyncio\' requires the aiohttp python module; falling back to \'Threads\'.\
+        \n{20*' '}Installable with \'pip3 install aiohttp\'")
+    network_engine = 'Threads'
+
+engine = None # only set with network_engine 'Asyncio'
+if network_engine == 'Asyncio':
+    # media & segment downloads are submitted to the engine as coroutines, all of them bounded by one connection budget; its thread only starts with the first request
+    # define a session for everything else, that sends its requests through the same event loop; callers block until their response arrived
+    engine = AsyncEngine(rate_limiter, concurrency = network_concurrency)
+    sess = EngineSession(engine)
+else:
+    # define requests session
+    sess = RateLimitedSession(rate_limiter)
+
+    # requests only keeps 10 connections per host by default; size the pool for every download worker fetching segments at once
+    sess.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize = download_workers * segment_workers))
+
+# m3u8 playlists probed by parse_media_info(), re-used by download_m3u8() for as long as their signature is valid
+playlist_cache = PlaylistCache()
+
+
 # delete previous redundant pyinstaller folders, older then an hour
 def del_redudant_pyinstaller_files():
     try:
@@ -195,19 +256,17 @@ def remind_stargazing():
                      'referer': f"Avnsx/Fansly Downloader {current_version}",
                      'accept-language': 'en-US,en;q=0.9'}
     
-    # get total_downloads count
-    stargazers_check_request = requests.get('https://api.github.com/repos/RalkeyOfficial/fansly-downloader/releases', allow_redirects = True, headers = stats_headers)
-    if not stargazers_check_request.ok:
+    # get total_downloads count; both counts change slowly enough to be re-used for a day
+    stargazers_check_request = http_cache.get_json('https://api.github.com/repos/RalkeyOfficial/fansly-downloader/releases', headers = stats_headers, ttl = 24 * 3600)
+    if not stargazers_check_request:
         return False
-    stargazers_check_request = stargazers_check_request.json()
     for x in stargazers_check_request:
         total_downloads += x['assets'][0]['download_count'] or 0
     
     # get stargazers_count
-    downloads_check_request = requests.get('https://api.github.com/repos/RalkeyOfficial/fansly-downloader', allow_redirects = True, headers = stats_headers)
-    if not downloads_check_request.ok:
+    downloads_check_request = http_cache.get_json('https://api.github.com/repos/RalkeyOfficial/fansly-downloader', headers = stats_headers, ttl = 24 * 3600)
+    if not downloads_check_request:
         return False
-    downloads_check_request = downloads_check_request.json()
     stargazers_count = downloads_check_request['stargazers_count'] or 0
 
     percentual_stars = round(stargazers_count / total_downloads * 100, 2)
@@ -218,7 +277,7 @@ def remind_stargazing():
             {5*' '}Help the repository grow today, by leaving a star on it and sharing it to others online!")
     s(15)
 
-if randint(1,100) <= 19:
+if randint(1,100) <= 19 and not unattended:
     try:
         remind_stargazing()
     except Exception: # irrelevant enough, to pass regardless what errors may happen
@@ -244,17 +303,21 @@ while True:
         with open(config_path, 'w', encoding='utf-8') as config_file:
             config.write(config_file)
 
-    # intentionally dont want to just .strip() spaces, because like this, it might give the user a food for thought, that he's supposed to enter the username tag after @ and not creators display name
-    if ' ' in config_username and not usern_error:
-        output(3, ' WARNING', '<yellow>', f"{usern_base_text}must be a concatenated string. No spaces!\n")
-        usern_error = True
+    # a comma separated list of usernames downloads all of them in one batch; every single one has to be valid
+    config_usernames = [username.strip() for username in config_username.split(',')]
+    for username in config_usernames:
+        if usern_error:
+            break
 
-    if not usern_error:
-        if len(config_username) < 4 or len(config_username) > 30:
+        # intentionally dont want to just .strip() spaces, because like this, it might give the user a food for thought, that he's supposed to enter the username tag after @ and not creators display name
+        if ' ' in username:
+            output(3, ' WARNING', '<yellow>', f"{usern_base_text}must be a concatenated string. No spaces!\n")
+            usern_error = True
+        elif len(username) < 4 or len(username) > 30:
             output(3, ' WARNING', '<yellow>', f"{usern_base_text}must be between 4 and 30 characters long!\n")
             usern_error = True
         else:
-            invalid_chars = set(config_username) - set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_")
+            invalid_chars = set(username) - set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_")
             if invalid_chars:
                 output(3, ' WARNING', '<yellow>', f"{usern_base_text}should only contain\n{20*' '}alphanumeric characters, hyphens, or underscores!\n")
                 usern_error = True
@@ -415,15 +478,11 @@ if not config_useragent or config_useragent and len(config_useragent) < 40 or 'R
             {7*' '}If you're not using chrome, you might want to replace it in the config.ini file later on.\n\
             {7*' '}more information regarding this topic is on the fansly downloader Wiki.")
 
-    try:
-        # thanks Jonathan Robson (@jnrbsn) - for continously providing these up-to-date user-agents
-        user_agent_req = requests.get('https://jnrbsn.github.io/user-agents/user-agents.json', headers = {'User-Agent': f"Avnsx/Fansly Downloader {current_version}", 'accept-language': 'en-US,en;q=0.9'})
-        if user_agent_req.ok:
-            user_agent_req = user_agent_req.json()
-            config_useragent = guess_user_agent(user_agent_req)
-        else:
-            config_useragent = ua_if_failed
-    except requests.exceptions.RequestException:
+    # thanks Jonathan Robson (@jnrbsn) - for continously providing these up-to-date user-agents; unattended runs only use a previously cached list
+    user_agent_req = http_cache.get_json('https://jnrbsn.github.io/user-agents/user-agents.json', headers = {'User-Agent': f"Avnsx/Fansly Downloader {current_version}", 'accept-language': 'en-US,en;q=0.9'}, ttl = 24 * 3600, offline = unattended)
+    if user_agent_req:
+        config_useragent = guess_user_agent(user_agent_req)
+    else:
         config_useragent = ua_if_failed
 
     # save useragent modification to config file
@@ -465,6 +524,7 @@ def get_adjusted_datetime(epoch_timestamp: int, diff_from_utc: int = diff_from_u
 # if the users custom provided filepath is invalid; a tkinter dialog will open during runtime, asking to adjust download path
 def ask_correct_dir():
     global BASE_DIR_NAME
+    from tkinter import Tk, filedialog
     root = Tk()
     root.withdraw()
     BASE_DIR_NAME = filedialog.askdirectory()
@@ -585,8 +645,22 @@ headers = {
 
 
 
+# amount of .ts files download_m3u8() keeps downloading ahead of the remuxer; bounds its memory usage, independent of the videos length
+M3U8_SEGMENT_QUEUE_DEPTH = 8
+
+# connect & read timeout in seconds, for every single .ts file request
+SEGMENT_TIMEOUT = (10, 60)
+
+# an output stream that copies the codec parameters of template, for remuxing without re-encoding
+# PyAV 14 removed add_stream(template=...) in favour of add_stream_from_template(); older versions only have the former
+def add_template_stream(output_container, template):
+    if hasattr(output_container, 'add_stream_from_template'):
+        return output_container.add_stream_from_template(template)
+    return output_container.add_stream(template=template)
+
 # m3u8 compability
-def download_m3u8(m3u8_url: str, save_path: str):
+# the transcoded mp4 is written to output_path, if given; e.g. a temporary file, that still gets tagged before being moved to save_path
+def download_m3u8(m3u8_url: str, save_path: str, progress: Progress, output_path: str = None):
     # parse m3u8_url for required strings
     parsed_url = {k: v for k, v in [s.split('=') for s in m3u8_url.split('?')[-1].split('&')]}
     policy = parsed_url.get('Policy')
@@ -603,76 +677,129 @@ def download_m3u8(m3u8_url: str, save_path: str):
         'ngsw-bypass': 'true'
     }
 
-    # download the m3u8 playlist
-    playlist_content_req = sess.get(m3u8_url, headers=headers, cookies=cookies)
-    if not playlist_content_req.ok:
-        output(2,'\n [12]ERROR','<red>', f'Failed downloading m3u8; at playlist_content request. Response code: {playlist_content_req.status_code}\n{playlist_content_req.text}')
-        return False
-    playlist_content = playlist_content_req.text
+    # re-use the playlist, if it was already fetched while probing the variant in parse_media_info()
+    playlist_obj = playlist_cache.get(m3u8_url)
+    if playlist_obj is None:
+        # download the m3u8 playlist
+        playlist_content_req = sess.get(m3u8_url, headers=headers, cookies=cookies)
+        if not playlist_content_req.ok:
+            output(2,'\n [12]ERROR','<red>', f'Failed downloading m3u8; at playlist_content request. Response code: {playlist_content_req.status_code}\n{playlist_content_req.text}')
+            return False
+        playlist_content = playlist_content_req.text
 
-    # parse the m3u8 playlist content using the m3u8 library
-    playlist_obj = m3u8.loads(playlist_content)
+        # parse the m3u8 playlist content using the m3u8 library
+        playlist_obj = m3u8.loads(playlist_content)
 
     # get a list of all the .ts files in the playlist
     ts_files = [segment.uri for segment in playlist_obj.segments if segment.uri.endswith('.ts')]
 
-    # define a nested function to download a single .ts file and return the content
-    def download_ts(ts_file: str):
-        ts_url = f"{split_m3u8_url}/{ts_file}"
-        ts_response = sess.get(ts_url, headers=headers, cookies=cookies, stream=True)
-        buffer = io.BytesIO()
-        for chunk in ts_response.iter_content(chunk_size=1024):
-            buffer.write(chunk)
-        ts_content = buffer.getvalue()
-        return ts_content
-
-    # if m3u8 seems like it might be bigger in total file size; display loading bar
-    text_column = TextColumn(f"", table_column=Column(ratio=0.355))
-    bar_column = BarColumn(bar_width=60, table_column=Column(ratio=2))
-    disable_loading_bar = False if len(ts_files) > 15 else True
-    progress = Progress(text_column, bar_column, expand=True, transient=True, disable=disable_loading_bar)
-    with progress:
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            ts_contents = [file for file in progress.track(executor.map(download_ts, ts_files), total=len(ts_files))]
-    
-    segment = bytearray()
-    for ts_content in ts_contents:
-        segment += ts_content
-
-    # Attempted to fix the error when audio does not exist, i think i fixed it, not sure, since i dont understand this code
-    input_container = av.open(io.BytesIO(segment), format='mpegts')
-    video_stream = input_container.streams.video[0]
-    audio_stream = input_container.streams.audio[0] if input_container.streams.audio else None
+    # every video gets its own segment cache next to its final location; keyed on the playlist url, because filenames differ between runs
+    # completed segments are kept there until the video was fully remuxed, so an interrupted download resumes from the segments it is missing
+    segment_cache_dir = join(os.path.dirname(save_path), '.segments', hashlib.md5(m3u8_url.encode('utf-8')).hexdigest())
+    makedirs(segment_cache_dir, exist_ok = True)
 
-    # define output container and streams
-    output_container = av.open(f"{save_path}.mp4", 'w') # add .mp4 file extension
-    video_stream = output_container.add_stream(template=video_stream)
-    audio_stream = output_container.add_stream(template=audio_stream) if audio_stream else None
-
-    start_pts = None
-    for packet in input_container.demux():
-        if packet.dts is None:
-            continue
+    # write atomically, so that only complete segments are ever picked up from the cache
+    def cache_ts(cached_path: str, ts_content: bytes):
+        with open(f"{cached_path}.part", 'wb') as f:
+            f.write(ts_content)
+        os.replace(f"{cached_path}.part", cached_path)
+        return ts_content
 
-        if start_pts is None:
-            start_pts = packet.pts
+    # define a nested function to download a single .ts file (or take it from the segment cache) and return the content
+    def download_ts(segment: tuple):
+        index, ts_file = segment
+        cached_path = join(segment_cache_dir, f"{index:05d}.ts")
+        if exists(cached_path):
+            with open(cached_path, 'rb') as f:
+                return f.read()
 
-        packet.pts -= start_pts
-        packet.dts -= start_pts
+        ts_url = f"{split_m3u8_url}/{ts_file}"
+        for attempt in range(segment_retries + 1):
+            try:
+                ts_response = sess.get(ts_url, headers=headers, cookies=cookies, stream=True, timeout=SEGMENT_TIMEOUT)
+                ts_response.raise_for_status()
+                ts_content = ts_response.content
+
+                # a dropped connection can end the body early, without raising an exception
+                expected_length = ts_response.headers.get('content-length')
+                if expected_length and int(expected_length) != len(ts_content):
+                    raise requests.exceptions.ContentDecodingError(f"Received {len(ts_content)} of {expected_length} bytes for segment {ts_file}")
+                break
+            except requests.exceptions.RequestException:
+                if attempt == segment_retries:
+                    raise
+                s(2 ** attempt) # back off before retrying
+        return cache_ts(cached_path, ts_content)
+
+    # network_engine 'Asyncio'; only submits the download of a single .ts file as coroutine & returns a Future of its content
+    def submit_ts(segment: tuple):
+        index, ts_file = segment
+        cached_path = join(segment_cache_dir, f"{index:05d}.ts")
+        if exists(cached_path):
+            future = concurrent.futures.Future()
+            with open(cached_path, 'rb') as f:
+                future.set_result(f.read())
+            return future
+
+        async def fetch_ts():
+            ts_content = await engine.fetch(f"{split_m3u8_url}/{ts_file}", headers=headers, cookies=cookies, timeout=SEGMENT_TIMEOUT, retries=segment_retries)
+            return await asyncio.get_running_loop().run_in_executor(None, cache_ts, cached_path, ts_content)
+        return engine.submit(fetch_ts())
 
-        if packet.stream == input_container.streams.video[0]:
-            packet.stream = video_stream
-        elif audio_stream and packet.stream == input_container.streams.audio[0]:
-            packet.stream = audio_stream
-        output_container.mux(packet)
+    # if m3u8 seems like it might be bigger in total file size; display loading bar
+    disable_loading_bar = False if len(ts_files) > 15 else True
+    task_id = progress.add_task('', total=len(ts_files), visible = not disable_loading_bar)
 
-    # close containers
-    input_container.close()
-    output_container.close()
+    # the .ts files are downloaded ahead in the background & fed in order to the demuxer; so only a few of them are held in memory at once
+    output_path = output_path or f"{save_path}.mp4" # add .mp4 file extension
+    # with the Asyncio network engine, the segments within the queue depth are downloaded as coroutines instead of by segment_workers threads
+    segment_stream = SegmentStream(submit_ts if engine else download_ts, list(enumerate(ts_files)), workers = segment_workers, queue_depth = max(M3U8_SEGMENT_QUEUE_DEPTH, segment_workers),
+                                   on_segment = lambda: progress.advance(task_id), asynchronous = engine is not None)
+    try:
+        # Attempted to fix the error when audio does not exist, i think i fixed it, not sure, since i dont understand this code
+        with av.open(segment_stream, format='mpegts') as input_container, av.open(output_path, 'w', format='mp4') as output_container:
+            video_stream = input_container.streams.video[0]
+            audio_stream = input_container.streams.audio[0] if input_container.streams.audio else None
+
+            # define output streams
+            video_stream = add_template_stream(output_container, video_stream)
+            audio_stream = add_template_stream(output_container, audio_stream) if audio_stream else None
+
+            # packets are muxed into the mp4 as soon as their segment arrived
+            start_pts = None
+            for packet in input_container.demux():
+                if packet.dts is None:
+                    continue
+
+                if start_pts is None:
+                    start_pts = packet.pts
+
+                packet.pts -= start_pts
+                packet.dts -= start_pts
+
+                if packet.stream == input_container.streams.video[0]:
+                    packet.stream = video_stream
+                elif audio_stream and packet.stream == input_container.streams.audio[0]:
+                    packet.stream = audio_stream
+                output_container.mux(packet)
+    except Exception:
+        # never leave a partial video behind; deduplication would treat it as complete. the segment cache is kept for resuming
+        try:
+            os.remove(output_path)
+        except OSError:
+            pass
+        output(2,'\n [37]ERROR','<red>', f"Failed downloading m3u8; {len(os.listdir(segment_cache_dir))} of {len(ts_files)} segments are cached & will be resumed next time.\n{traceback.format_exc()}")
+        return False
+    finally:
+        segment_stream.close()
+        progress.remove_task(task_id)
 
+    # the video is complete; its cached segments aren't needed anymore
+    shutil.rmtree(segment_cache_dir, ignore_errors = True)
     return True
 
-def download_mpd(mpd_url: str, save_path: str):
+# the muxed mp4 is written to output_path, if given; just like with download_m3u8()
+def download_mpd(mpd_url: str, save_path: str, output_path: str = None):
     # parse mpd_url for required strings
     parsed_url = {k: v for k, v in [s.split('=') for s in mpd_url.split('?')[-1].split('&')]}
     policy = parsed_url.get('Policy')
@@ -680,6 +807,7 @@ def download_mpd(mpd_url: str, save_path: str):
     signature = parsed_url.get('Signature')
     mpd_url = mpd_url.split('.mpd')[0] + '.mpd'  # re-construct original .mpd base link
     save_path = save_path.rsplit('.mpd')[0] + ".mp4"  # remove file_extension from save_path
+    output_path = output_path or save_path
 
     cookies = {
         'CloudFront-Key-Pair-Id': key_pair_id,
@@ -714,19 +842,21 @@ def download_mpd(mpd_url: str, save_path: str):
     video_url = base_url + video_base_url
     audio_url = base_url + audio_base_url if audio_base_url else None
 
-    # Create a hidden temp folder to store downloads in
-    hidden_folder_dir = ".temp"
+    # Create a hidden temp folder next to the final location, to store downloads in
+    hidden_folder_dir = join(os.path.dirname(save_path), ".temp")
     os_name = platform.system()
     if os_name == 'Windows':
         # Create the folder if it doesn't exist
         if not os.path.exists(hidden_folder_dir):
-            os.mkdir(hidden_folder_dir)
+            os.makedirs(hidden_folder_dir, exist_ok=True)
 
-        # Set the folder's hidden attribute in Windows
-        subprocess.run(['attrib', '+h', hidden_folder_dir], check=True)
+            # Set the folder's hidden attribute in Windows
+            subprocess.run(['attrib', '+h', hidden_folder_dir], check=True)
     else:
-        if not os.path.exists(hidden_folder_dir):
-            os.mkdir(hidden_folder_dir)
+        os.makedirs(hidden_folder_dir, exist_ok=True)
+
+    # every mpd download gets its own unique job folder, so that several of them can run at once
+    job_dir = tempfile.mkdtemp(prefix='mpd_', dir=hidden_folder_dir)
 
     def download_file(url, file_path):
         if url is None:
@@ -734,47 +864,71 @@ def download_mpd(mpd_url: str, save_path: str):
         res = sess.get(url, headers=headers, cookies=cookies, stream=True)
         res.raise_for_status()  # Raise an exception if the request fails
         with open(file_path, 'wb') as f:
-            for chunk in res.iter_content(chunk_size=1024):
+            for chunk in res.iter_content(chunk_size=1_048_576):
                 f.write(chunk)
 
     # hidden temp folder + file names
-    video_file_path = os.path.join(hidden_folder_dir, "temp_video.mp4")
-    audio_file_path = os.path.join(hidden_folder_dir, "temp_audio.mp4")
-
-    # start download of the video and audio, and put it in the hidden folder
-    download_file(video_url, video_file_path)
-    download_file(audio_url, audio_file_path)
-
-    # combine the video and audio together into 1 file IF both video and audio are present
-    if video_url and audio_url:
-        # I am aware that using FFMPEG is not the best practice, however I don't know of any better alternative
-        ffmpeg = (
-            FFmpeg()
-            .option("y")
-            .input(video_file_path)
-            .input(audio_file_path)
-            .output(
-                save_path,
-                codec="copy",
-            )
-        )
-        ffmpeg.execute()
-    elif video_url and not audio_url:  # else move the video in .temp folder to the normal path + rename it
-        os.rename(video_file_path, save_path)
-
-    # remove the video and audio file in the temp folder after everything is done
-    try:  # if there is not a video file at video_file_path, continue the code without giving error
-        os.remove(video_file_path)
-    except OSError:
-        pass
+    video_file_path = os.path.join(job_dir, "video.mp4")
+    audio_file_path = os.path.join(job_dir, "audio.mp4")
 
-    try:  # if there is not a audio file at audio_file_path, continue the code without giving error
-        os.remove(audio_file_path)
-    except OSError:
-        pass
+    try:
+        # download the video and audio in parallel, and put them in the job folder
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            downloads = [executor.submit(download_file, video_url, video_file_path), executor.submit(download_file, audio_url, audio_file_path)]
+            for download in downloads:
+                download.result()
+
+        # combine the video and audio together into 1 file IF both video and audio are present
+        if video_url and audio_url:
+            try:
+                mux_video_audio(video_file_path, audio_file_path, output_path)
+            except Exception:
+                # fall back to the ffmpeg binary, if PyAV couldn't stream-copy the representations
+                output(3,'\n WARNING','<yellow>', f"In-process muxing failed, falling back to ffmpeg:\n{traceback.format_exc()}")
+                from ffmpeg import FFmpeg
+                ffmpeg = (
+                    FFmpeg()
+                    .option("y")
+                    .input(video_file_path)
+                    .input(audio_file_path)
+                    .output(
+                        output_path,
+                        codec="copy",
+                        f="mp4",
+                    )
+                )
+                ffmpeg.execute()
+        elif video_url and not audio_url:  # else move the video in the job folder to the normal path + rename it
+            os.replace(video_file_path, output_path)
+    finally:
+        # remove the job folder with its video and audio file after everything is done
+        shutil.rmtree(job_dir, ignore_errors=True)
 
     return True
 
+# stream-copy a separate video & audio file into one mp4, interleaving their packets by timestamp
+def mux_video_audio(video_file_path: str, audio_file_path: str, save_path: str):
+    with av.open(video_file_path) as video_container, av.open(audio_file_path) as audio_container, av.open(save_path, 'w', format='mp4') as output_container:
+        video_input = video_container.streams.video[0]
+        audio_input = audio_container.streams.audio[0]
+        video_stream = add_template_stream(output_container, video_input)
+        audio_stream = add_template_stream(output_container, audio_input)
+
+        # demux yields a final flushing packet without timestamps, which must not be muxed
+        def timed_packets(container, stream):
+            for packet in container.demux(stream):
+                if packet.dts is not None:
+                    yield packet
+
+        for packet in heapq.merge(timed_packets(video_container, video_input), timed_packets(audio_container, audio_input), key=lambda packet: packet.dts * packet.time_base):
+            packet.stream = video_stream if packet.stream == video_input else audio_stream
+            output_container.mux(packet)
+
+
+# Collections are fetched page by page from /account/media/orders & their details in batches of ids, with a few batches in flight at once
+COLLECTION_ORDERS_PAGE_SIZE = 100
+COLLECTION_BATCH_SIZE = 50
+COLLECTION_FETCH_WORKERS = 4
 
 # define base threshold (used for when modules don't provide vars)
 DUPLICATE_THRESHOLD = 50
@@ -793,46 +947,235 @@ class DuplicateCountError(Exception):
         self.message = f"Irrationally high rise in duplicates: {duplicate_count}"
         super().__init__(self.message)
 
-pic_count, vid_count, duplicate_count = 0, 0, 0 # count downloaded content & duplicates, from all modules globally
+class DownloadFailedError(Exception):
+    def __init__(self, filename, status_code, content):
+        self.message = f"Download failed on filename: {filename} - due to an network error --> status_code: {status_code} | content: \n{content}"
+        super().__init__(self.message)
 
-# deduplication functionality variables
+class DownloadState:
+    """
+    What is this?
+    The download state of a single module run, e.g. the Timeline & Messages of one creator, a Single post or the Collections.
+    Every job within the download pipeline carries the state it belongs to; so the content of several creators can flow through the same pipeline at once,
+    while each of them keeps its own download directory, duplicate threshold, counters & content hashes to deduplicate against.
+    """
+    def __init__(self, creator_name: str, hashes = None):
+        self.creator_name = creator_name
+        self.hashes = hashes or hashes_for(creator_name)
+        self.base_dir = None
+        self.duplicate_threshold = DUPLICATE_THRESHOLD
+        self.pic_count, self.vid_count, self.duplicate_count = 0, 0, 0 # count downloaded content & duplicates
+        self.failed = False
+        download_states.append(self)
+
+download_states = [] # every DownloadState of this run, for the final summary
+
+# deduplication functionality variables; media ids are unique across all of fansly, so they're shared by every creator
 recent_photo_media_ids, recent_video_media_ids, recent_audio_media_ids = set(), set(), set()
-recent_photo_hashes, recent_video_hashes, recent_audio_hashes = set(), set(), set()
 
-def sort_download(accessible_media: dict):
-    # global required so we can use them at the end of the whole code in global space
-    global pic_count, vid_count, save_dir, recent_photo_media_ids, recent_video_media_ids, recent_audio_media_ids, recent_photo_hashes, recent_video_hashes, recent_audio_hashes, duplicate_count
-    
-    # loop through the accessible_media and download the media files
-    for post in accessible_media:
-        # extract the necessary information from the post
-        media_id = post['media_id']
-        created_at = get_adjusted_datetime(post['created_at'])
-        mimetype = post['mimetype']
-        download_url = post['download_url']
-        file_extension = post['file_extension']
-        is_preview = post['is_preview']
-        metadata_manager = MetadataManager()
-        ext_sup = metadata_manager.is_file_supported('mp4' if (file_extension == 'm3u8' or 'mpd') else file_extension)
-        append_metadata = metadata_handling == 'Advanced' and ext_sup if metadata_handling == 'Advanced' and ext_sup else False
-
-        # verify that the duplicate count has not drastically spiked and in-case it did; verify that the spiked amount is significant enough to cancel scraping
-        if utilise_duplicate_threshold and duplicate_count > DUPLICATE_THRESHOLD and DUPLICATE_THRESHOLD > 50:
-            raise DuplicateCountError(duplicate_count)
-
-        if append_metadata:
-            filename = f"{created_at}_preview.{file_extension}" if is_preview else f"{created_at}.{file_extension}"
-            metadata_manager.set_filepath(filename) # set basic filename, so the class can tell its file extension already
-            metadata_manager.set_custom_metadata("ID", media_id)
-        else:
-            # general filename construction & if content is a preview; add that into its filename
-            filename = f"{created_at}_preview_id_{media_id}.{file_extension}" if is_preview else f"{created_at}_id_{media_id}.{file_extension}"
+# download workers share the deduplication variables & counters, so every check-and-add on them has to happen under this lock
+dedup_lock = threading.Lock()
+# serializes computing the full md5 of fingerprint collisions; so a concurrent download of the same file waits for it, instead of missing it
+fingerprint_lock = threading.Lock()
+
+class CreatorHashes:
+    """
+    What is this?
+    The content hashes of the pre-existing & downloaded files of a single creator.
+    Unlike media ids, hashes are only compared within the folder of one creator; in batch mode an upload identical to another creators file must still be saved.
+    """
+    def __init__(self):
+        self.photo = PhashIndex(max_distance = photo_hash_distance) # with photo_hash_distance, also matches re-compressed or slightly resized re-uploads, by Hamming distance
+        self.video, self.audio = set(), set()
+        # fingerprint -> filepaths of pre-existing videos & audio, whose full md5 is only computed once a download collides with their fingerprint
+        self.video_fingerprints, self.audio_fingerprints = {}, {}
+
+creator_hashes = {} # creator name -> CreatorHashes
+
+def hashes_for(creator_name: str):
+    with dedup_lock:
+        return creator_hashes.setdefault(creator_name, CreatorHashes())
+
 
-        # deduplication - part 1: decide if this media is even worth further processing; by media id
+# the sidecar of a .part file; remembers which url it belongs to & how long it's supposed to get
+def read_part_sidecar(temp_path: str, url_identity: str):
+    try:
+        with open(f"{temp_path}.json", 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        if sidecar.get('url') == url_identity and exists(temp_path):
+            return sidecar
+    except (OSError, ValueError):
+        pass
+    return None
+
+# how far an earlier attempt got with temp_path; returns its length, the expected length of the whole file & the md5 hash object of what's there already
+def resume_part(temp_path: str, url_identity: str):
+    sidecar = read_part_sidecar(temp_path, url_identity)
+    resume_from = os.path.getsize(temp_path) if sidecar else 0
+    expected_length = sidecar.get('length') if sidecar else None
+
+    # the md5 state can't be persisted, so the already downloaded part gets hashed again
+    md5_hash = hashlib.md5()
+    if resume_from:
+        with open(temp_path, 'rb') as f:
+            while (part := f.read(1_048_576)):
+                md5_hash.update(part)
+    return resume_from, expected_length, md5_hash
+
+# decides by the response to a (Range) request, whether it continues temp_path or starts over; writes the sidecar & returns the updated resume state
+def continue_part(temp_path: str, url_identity: str, response, resume_from: int, expected_length, md5_hash):
+    content_length = int(response.headers.get('content-length', 0))
+    if response.status_code == 206 and response.headers.get('content-range', '').startswith(f"bytes {resume_from}-"):
+        file_mode = 'ab'
+        expected_length = resume_from + content_length if content_length else expected_length
+    else:
+        # server ignored the Range request; fall back to a full fetch
+        file_mode, resume_from, md5_hash = 'wb', 0, hashlib.md5()
+        expected_length = content_length or None
+
+    with open(f"{temp_path}.json", 'w', encoding='utf-8') as f:
+        json.dump({'url': url_identity, 'length': expected_length}, f)
+    return file_mode, resume_from, expected_length, md5_hash
+
+# a dropped connection can end the body early, without raising an exception
+def verify_part_length(temp_path: str, expected_length, filename: str):
+    downloaded_length = os.path.getsize(temp_path)
+    if expected_length and downloaded_length != expected_length:
+        raise requests.exceptions.ContentDecodingError(f"Received {downloaded_length} of {expected_length} bytes for {filename}")
+
+# streams download_url into temp_path, while md5 hashing it on the fly; returns the md5 hash object
+# an interrupted download leaves its .part file & sidecar behind, so a retry or the next run continues it with a Range request, if the server supports that
+def download_resumable(download_url: str, temp_path: str, filename: str, progress: Progress):
+    url_identity = download_url.split('?')[0] # the query only carries the ever changing signature
+    sidecar_path = f"{temp_path}.json"
+
+    for attempt in range(segment_retries + 1):
+        resume_from, expected_length, md5_hash = resume_part(temp_path, url_identity)
+        if resume_from and expected_length and resume_from == expected_length:
+            break # completely downloaded during an earlier attempt
+
+        try:
+            request_headers = dict(headers, Range=f"bytes={resume_from}-") if resume_from else headers
+            response = sess.get(download_url, stream=True, headers=request_headers, timeout=SEGMENT_TIMEOUT)
+
+            if response.status_code == 416: # the part file doesn't fit the media anymore; start over
+                os.remove(temp_path)
+                raise requests.exceptions.RequestException(f"Requested range of {filename} is not satisfiable")
+            if not response.ok:
+                raise DownloadFailedError(filename, response.status_code, response.content)
+
+            file_mode, resume_from, expected_length, md5_hash = continue_part(temp_path, url_identity, response, resume_from, expected_length, md5_hash)
+
+            disable_loading_bar = False if expected_length and expected_length >= 20000000 else True # if file size is above 20MB; display loading bar
+            task_id = progress.add_task('', total=expected_length, completed=resume_from, visible = not disable_loading_bar)
+            try:
+                with open(temp_path, file_mode) as f:
+                    for chunk in response.iter_content(chunk_size=1_048_576):
+                        if chunk:
+                            f.write(chunk)
+                            md5_hash.update(chunk)
+                            progress.advance(task_id, len(chunk))
+            finally:
+                progress.remove_task(task_id)
+
+            verify_part_length(temp_path, expected_length, filename)
+            break
+        except requests.exceptions.RequestException:
+            if attempt == segment_retries:
+                raise # the .part file & its sidecar stay, so the next run resumes it
+            s(2 ** attempt) # back off before retrying
+
+    # only validated downloads make it here; their sidecar isn't needed anymore
+    if exists(sidecar_path):
+        os.remove(sidecar_path)
+    return md5_hash
+
+# network_engine 'Asyncio'; the coroutine counterpart of download_resumable(), which runs on the engines event loop instead of blocking a download worker
+# disk i/o & md5 hashing are handed to the loops executor, so they don't stall the other downloads in flight
+async def download_resumable_async(download_url: str, temp_path: str, filename: str, progress: Progress):
+    loop = asyncio.get_running_loop()
+    url_identity = download_url.split('?')[0] # the query only carries the ever changing signature
+    sidecar_path = f"{temp_path}.json"
+
+    def write_chunk(f, md5_hash, chunk: bytes):
+        f.write(chunk)
+        md5_hash.update(chunk)
+
+    for attempt in range(segment_retries + 1):
+        resume_from, expected_length, md5_hash = await loop.run_in_executor(None, resume_part, temp_path, url_identity)
+        if resume_from and expected_length and resume_from == expected_length:
+            break # completely downloaded during an earlier attempt
+
+        try:
+            request_headers = dict(headers, Range=f"bytes={resume_from}-") if resume_from else headers
+            response = await engine.request('GET', download_url, stream=True, headers=request_headers, timeout=SEGMENT_TIMEOUT)
+            try:
+                if response.status_code == 416: # the part file doesn't fit the media anymore; start over
+                    os.remove(temp_path)
+                    raise requests.exceptions.RequestException(f"Requested range of {filename} is not satisfiable")
+                if not response.ok:
+                    raise DownloadFailedError(filename, response.status_code, await response.read())
+
+                file_mode, resume_from, expected_length, md5_hash = continue_part(temp_path, url_identity, response, resume_from, expected_length, md5_hash)
+
+                disable_loading_bar = False if expected_length and expected_length >= 20000000 else True # if file size is above 20MB; display loading bar
+                task_id = progress.add_task('', total=expected_length, completed=resume_from, visible = not disable_loading_bar)
+                try:
+                    with open(temp_path, file_mode) as f:
+                        async for chunk in response.iter_chunks(1_048_576):
+                            await loop.run_in_executor(None, write_chunk, f, md5_hash, chunk)
+                            progress.advance(task_id, len(chunk))
+                finally:
+                    progress.remove_task(task_id)
+            finally:
+                response.close()
+
+            verify_part_length(temp_path, expected_length, filename)
+            break
+        except requests.exceptions.RequestException:
+            if attempt == segment_retries:
+                raise # the .part file & its sidecar stay, so the next run resumes it
+            await asyncio.sleep(2 ** attempt) # back off before retrying
+
+    # only validated downloads make it here; their sidecar isn't needed anymore
+    if exists(sidecar_path):
+        os.remove(sidecar_path)
+    return md5_hash
+
+# every accessible media item is handed through the stages of download_pipeline as a job dict; stage 1: network
+# deduplicates by media id, determines the save path and downloads the media; normal files into a temporary .part file, while md5 hashing them on the fly
+def fetch_media_item(job: dict):
+    # extract the necessary information from the post
+    state = job['state']
+    media_id = job['media_id']
+    created_at = get_adjusted_datetime(job['created_at'])
+    mimetype = job['mimetype']
+    download_url = job['download_url']
+    file_extension = job['file_extension']
+    is_preview = job['is_preview']
+    progress = job['progress']
+    metadata_manager = MetadataManager()
+    ext_sup = metadata_manager.is_file_supported('mp4' if (file_extension == 'm3u8' or 'mpd') else file_extension)
+    append_metadata = metadata_handling == 'Advanced' and ext_sup if metadata_handling == 'Advanced' and ext_sup else False
+
+    # verify that the duplicate count has not drastically spiked and in-case it did; verify that the spiked amount is significant enough to cancel scraping
+    if utilise_duplicate_threshold and state.duplicate_count > state.duplicate_threshold and state.duplicate_threshold > 50:
+        raise DuplicateCountError(state.duplicate_count)
+
+    if append_metadata:
+        filename = f"{created_at}_preview.{file_extension}" if is_preview else f"{created_at}.{file_extension}"
+        metadata_manager.set_filepath(filename) # set basic filename, so the class can tell its file extension already
+        metadata_manager.set_custom_metadata("ID", media_id)
+    else:
+        # general filename construction & if content is a preview; add that into its filename
+        filename = f"{created_at}_preview_id_{media_id}.{file_extension}" if is_preview else f"{created_at}_id_{media_id}.{file_extension}"
+
+    # deduplication - part 1: decide if this media is even worth further processing; by media id
+    with dedup_lock:
         if any([media_id in recent_photo_media_ids, media_id in recent_video_media_ids]):
             output(1,' Info','<light-blue>', f"Deduplication [Media ID]: {mimetype.split('/')[-2]} \'{filename}\' → declined")
-            duplicate_count += 1
-            continue
+            state.duplicate_count += 1
+            return
         else:
             if 'image' in mimetype:
                 recent_photo_media_ids.add(media_id)
@@ -841,169 +1184,211 @@ def sort_download(accessible_media: dict):
             elif 'audio' in mimetype:
                 recent_audio_media_ids.add(media_id)
 
-        # for collections downloads we just put everything into the same folder
-        if "Collection" in download_mode:
-            save_path = join(BASE_DIR_NAME, filename)
-            save_dir = join(BASE_DIR_NAME, filename) # compatibility for final "Download finished...!" print
+    # for collections downloads we just put everything into the same folder
+    if "Collection" in download_mode:
+        save_path = join(state.base_dir, filename)
 
-            if not exists(BASE_DIR_NAME):
-                makedirs(BASE_DIR_NAME, exist_ok = True)
+        if not exists(state.base_dir):
+            makedirs(state.base_dir, exist_ok = True)
 
-        # for every other type of download; we do want to determine the sub-directory to save the media file based on the mimetype
+    # for every other type of download; we do want to determine the sub-directory to save the media file based on the mimetype
+    else:
+        if 'image' in mimetype:
+            media_dir = join(state.base_dir, "Pictures")
+        elif 'video' in mimetype:
+            media_dir = join(state.base_dir, "Videos")
+        elif 'audio' in mimetype:
+            media_dir = join(state.base_dir, "Audio")
         else:
-            if 'image' in mimetype:
-                save_dir = join(BASE_DIR_NAME, "Pictures")
-            elif 'video' in mimetype:
-                save_dir = join(BASE_DIR_NAME, "Videos")
-            elif 'audio' in mimetype:
-                save_dir = join(BASE_DIR_NAME, "Audio")
-            else:
-                # if the mimetype is neither image nor video, skip the download
-                output(3,'\n WARNING','<yellow>', f"Unknown mimetype; skipping download for mimetype: \'{mimetype}\' | media_id: {media_id}")
-                continue
-            
-            # decides to separate previews or not
-            if is_preview and separate_previews:
-                save_path = join(save_dir, 'Previews', filename)
-                save_dir = join(save_dir, 'Previews')
-            else:
-                save_path = join(save_dir, filename)
-
-            if not exists(save_dir):
-                makedirs(save_dir, exist_ok = True)
+            # if the mimetype is neither image nor video, skip the download
+            output(3,'\n WARNING','<yellow>', f"Unknown mimetype; skipping download for mimetype: \'{mimetype}\' | media_id: {media_id}")
+            return
         
-        # if show_downloads is True / downloads should be shown
-        if show_downloads:
-            output(1,' Info','<light-blue>', f"Downloading {mimetype.split('/')[-2]} \'{filename}\'")
-
-        if file_extension == 'm3u8':
-            # handle the download of a m3u8 file
-            file_downloaded = download_m3u8(m3u8_url=download_url, save_path=save_path)
-            if file_downloaded:
-                # after being transcoded, the file is now a mp4
-                save_path = save_path.replace('.m3u8', '.mp4')
-                file_extension = 'mp4'
-                if append_metadata:
-                    # add the temp-stored media_id to the now transcoded mp4 file, as Exif metadata
-                    metadata_manager.set_filepath(save_path)
-                    metadata_manager.add_metadata()
-                    metadata_manager.save()
-                    # add filehash to the transcoded mp4 file
-                    hash_audio_video(save_path, content_format='video')
-                pic_count += 1 if 'image' in mimetype else 0
-                vid_count += 1 if 'video' in mimetype else 0
-        elif file_extension == 'mpd':
-            # handle the download of a mpd file
-            file_downloaded = download_mpd(mpd_url=download_url, save_path=save_path)
-            if file_downloaded:
-                # after being transcoded, the file is now a mp4
-                save_path = save_path.replace('.mpd', '.mp4')
-                file_extension = 'mp4'
-                if append_metadata:
-                    # add the temp-stored media_id to the now transcoded mp4 file, as Exif metadata
-                    metadata_manager.set_filepath(save_path)
-                    metadata_manager.add_metadata()
-                    metadata_manager.save()
-                    # add filehash to the transcoded mp4 file
-                    hash_audio_video(save_path, content_format='video')
-                pic_count += 1 if 'image' in mimetype else 0
-                vid_count += 1 if 'video' in mimetype else 0
+        # decides to separate previews or not
+        if is_preview and separate_previews:
+            save_path = join(media_dir, 'Previews', filename)
+            media_dir = join(media_dir, 'Previews')
         else:
-            # handle the download of a normal media file
-            response = sess.get(download_url, stream=True, headers=headers)
-
-            if response.ok:
-                text_column = TextColumn(f"", table_column=Column(ratio=0.355))
-                bar_column = BarColumn(bar_width=60, table_column=Column(ratio=2))
-                file_size = int(response.headers.get('content-length', 0))
-                disable_loading_bar = False if file_size and file_size >= 20000000 else True # if file size is above 20MB; display loading bar
-                progress = Progress(text_column, bar_column, expand=True, transient=True, disable = disable_loading_bar)
-                task_id = progress.add_task('', total=file_size)
-                progress.start()
-                # iterate over the response data in chunks
-                content = bytearray()
-                for chunk in response.iter_content(chunk_size=1024):
-                    if chunk:
-                        content += chunk
-                        progress.advance(task_id, len(chunk))
-                progress.refresh()
-                progress.stop()
-                
-                file_hash = None
-                # utilise hashing for images
-                if 'image' in mimetype:
-                    # open the image
-                    img = Image.open(io.BytesIO(content))
-
-                    # calculate the hash of the resized image
-                    photohash = str(imagehash.phash(img, hash_size = 16))
-
-                    # deduplication - part 2.1: decide if this photo is even worth further processing; by hashing
-                    if photohash in recent_photo_hashes:
-                        output(1,' Info','<light-blue>', f"Deduplication [Hashing]: {mimetype.split('/')[-2]} \'{filename}\' → declined")
-                        duplicate_count += 1
-                        continue
-                    else:
-                        recent_photo_hashes.add(photohash)
+            save_path = join(media_dir, filename)
 
-                    # close the image
-                    img.close()
-
-                    file_hash = photohash
+        if not exists(media_dir):
+            makedirs(media_dir, exist_ok = True)
+    
+    # if show_downloads is True / downloads should be shown
+    if show_downloads:
+        output(1,' Info','<light-blue>', f"Downloading {mimetype.split('/')[-2]} \'{filename}\'")
 
-                # utilise hashing for videos
-                elif 'video' in mimetype:
-                    videohash = hashlib.md5(content).hexdigest()
+    job.update(filename = filename, metadata_manager = metadata_manager, append_metadata = append_metadata, streamed = file_extension in ['m3u8', 'mpd'])
 
-                    # deduplication - part 2.2: decide if this video is even worth further processing; by hashing
-                    if videohash in recent_video_hashes:
-                        output(1,' Info','<light-blue>', f"Deduplication [Hashing]: {mimetype.split('/')[-2]} \'{filename}\' → declined")
-                        duplicate_count += 1
-                        continue
-                    else:
-                        recent_video_hashes.add(videohash)
-
-                    file_hash = videohash
-                
-                # utilise hashing for audio
-                elif 'audio' in mimetype:
-                    audiohash = hashlib.md5(content).hexdigest()
-
-                    # deduplication - part 2.2: decide if this audio is even worth further processing; by hashing
-                    if audiohash in recent_audio_hashes:
-                        output(1,' Info', '<light-blue>', f"Deduplication [Hashing]: {mimetype.split('/')[-2]} \'{filename}\' → declined")
-                        duplicate_count += 1
-                        continue
-                    else:
-                        recent_audio_hashes.add(audiohash)
-
-                    file_hash = audiohash
-
-                if append_metadata:
-                    metadata_manager.set_custom_metadata("HSH", file_hash)
-                    # finally write the full file to disk
-                    with open(save_path, 'wb') as f:
-                        f.write(content)
-                    # set finalized filepath instead of dummy filename and write the previously temp-stored metadata
-                    metadata_manager.set_filepath(save_path)
-                    metadata_manager.add_metadata()
-                    metadata_manager.save()
-                else:
-                    # hacky overwrite for save_path to introduce file hash to filename
-                    base_path, extension = os.path.splitext(save_path)
-                    save_path = f"{base_path}_hash_{file_hash}{extension}"
-                    with open(save_path, 'wb') as f:
-                        f.write(content)
-
-                # we only count them if the file was actually written
-                pic_count += 1 if 'image' in mimetype else 0; vid_count += 1 if 'video' in mimetype else 0
-            else:
-                output(2,'\n [13]ERROR','<red>', f"Download failed on filename: {filename} - due to an network error --> status_code: {response.status_code} | content: \n{response.content}")
-                input()
-                exit()
-    s(uniform(30, 60)) # slow down to avoid the fansly rate-limit, which was introduced in late august 2023
+    # every download is written into a temporary file next to its final location; it's tagged there & only moved to its final path afterwards
+    if file_extension == 'm3u8':
+        # handle the download of a m3u8 file
+        temp_path = join(os.path.dirname(save_path), f"{media_id}.mp4.part")
+        if not download_m3u8(m3u8_url=download_url, save_path=save_path, progress=progress, output_path=temp_path):
+            return
+        # after being transcoded, the file is now a mp4
+        job.update(save_path = save_path.replace('.m3u8', '.mp4'), temp_path = temp_path)
+    elif file_extension == 'mpd':
+        # handle the download of a mpd file
+        temp_path = join(os.path.dirname(save_path), f"{media_id}.mp4.part")
+        if not download_mpd(mpd_url=download_url, save_path=save_path, output_path=temp_path):
+            return
+        # after being transcoded, the file is now a mp4
+        job.update(save_path = save_path.replace('.mpd', '.mp4'), temp_path = temp_path)
+    else:
+        # handle the download of a normal media file; into a temporary file next to its final location, which is resumed if a previous attempt was interrupted
+        temp_path = join(os.path.dirname(save_path), f"{media_id}.{file_extension}.part")
+        job.update(save_path = save_path, temp_path = temp_path)
+        if engine:
+            # the download runs as coroutine on the engines event loop; the pipeline hands the job on, once it finished
+            async def download_job():
+                job['md5_hash'] = await download_resumable_async(download_url, temp_path, filename, progress)
+                return job
+            return engine.submit(download_job())
+        job['md5_hash'] = download_resumable(download_url, temp_path, filename, progress)
+    return job
+
+# stage 2: cpu; pHashes images & finalizes the md5 of videos and audio, to deduplicate them by hash
+def hash_media_item(job: dict):
+    # transcoded m3u8 & mpd downloads get fingerprinted together with their metadata, in the tagging stage
+    if job['streamed']:
+        return job
+
+    mimetype = job['mimetype']
+    hashes = job['state'].hashes
+
+    # utilise hashing for images
+    if 'image' in mimetype:
+        # open the image from the temporary file & calculate the hash of the resized image
+        with Image.open(job['temp_path']) as img:
+            file_hash = str(imagehash.phash(img, hash_size = 16))
+        recent_hashes = hashes.photo
+    # utilise md5 hashing for videos & audio; pre-existing files that collide with the downloads fingerprint get their md5 computed first
+    elif 'video' in mimetype or 'audio' in mimetype:
+        file_hash = job['md5_hash'].hexdigest()
+        job['fingerprint'] = quick_fingerprint(job['temp_path'])
+        if 'video' in mimetype:
+            recent_hashes = hashes.video
+            hash_colliding_media(job['fingerprint'], hashes.video, hashes.video_fingerprints)
+        else:
+            recent_hashes = hashes.audio
+            hash_colliding_media(job['fingerprint'], hashes.audio, hashes.audio_fingerprints)
+    else:
+        return job
+
+    # deduplication - part 2: decide if this media is even worth further processing; by hashing
+    with dedup_lock:
+        if file_hash in recent_hashes:
+            output(1,' Info','<light-blue>', f"Deduplication [Hashing]: {mimetype.split('/')[-2]} \'{job['filename']}\' → declined")
+            job['state'].duplicate_count += 1
+            os.remove(job['temp_path'])
+            return
+        else:
+            recent_hashes.add(file_hash)
+
+    job['file_hash'] = file_hash
+    return job
+
+# stage 3: metadata; writes the media id & hash into the temporary file, so every file reaches its final path fully tagged & in a single write
+def tag_media_item(job: dict):
+    metadata_manager = job['metadata_manager']
+
+    if job['streamed']:
+        if job['append_metadata']:
+            # add the temp-stored media_id to the now transcoded mp4 file, as Exif metadata
+            metadata_service.write(job['temp_path'], metadata_manager.custom_metadata, filetype = 'mp4').result()
+        # transcoded videos are only fingerprinted; their full md5 is computed once a download collides with it
+        job['fingerprint'] = quick_fingerprint(job['temp_path'])
+    elif job['append_metadata']:
+        # the filetype is told by the dummy filename, as the temporary files extension is .part
+        metadata_manager.set_custom_metadata("HSH", job['file_hash'])
+        metadata_service.write(job['temp_path'], metadata_manager.custom_metadata, filetype = metadata_manager.filetype).result()
+    return job
+
+# stage 4: disk; promotes the tagged temporary file to its final path and records it as downloaded
+def write_media_item(job: dict):
+    media_id, mimetype = job['media_id'], job['mimetype']
+
+    if not job['append_metadata'] and not job['streamed']:
+        # hacky overwrite for save_path to introduce file hash to filename
+        base_path, extension = os.path.splitext(job['save_path'])
+        job['save_path'] = f"{base_path}_hash_{job['file_hash']}{extension}"
+    os.replace(job['temp_path'], job['save_path'])
+
+    # record the finalized file in the deduplication index
+    if job['streamed']:
+        remember_media(job['save_path'], 'video', media_id, None, job['fingerprint'], hashes = job['state'].hashes)
+    elif dedup_index:
+        dedup_index.add(job['save_path'], media_id, job['file_hash'], mimetype.split('/')[0], job.get('fingerprint'))
+    if folder_manifest:
+        manifest_for(os.path.dirname(job['save_path'])).append(os.path.basename(job['save_path']), media_id, job.get('file_hash'))
+
+    # we only count them if the file was actually written
+    with dedup_lock:
+        job['state'].pic_count += 1 if 'image' in mimetype else 0
+        job['state'].vid_count += 1 if 'video' in mimetype else 0
+
+# jobs the pipeline drops, once another job of their creator failed (e.g. DuplicateCountError); their temporary file & its sidecar would otherwise stay within the media folders
+def discard_media_item(job: dict):
+    temp_path = job.get('temp_path')
+    if temp_path:
+        for path in [temp_path, f"{temp_path}.json"]:
+            if exists(path):
+                os.remove(path)
+
+# rich only allows a single live display at a time; so every sort_download() call shares this one, even while several creators download at once
+download_progress = Progress(TextColumn(f"", table_column=Column(ratio=0.355)), BarColumn(bar_width=60, table_column=Column(ratio=2)), expand=True, transient=True)
+download_progress_users = 0
+download_progress_lock = threading.Lock()
+
+@contextmanager
+def shared_download_progress():
+    global download_progress_users
+    with download_progress_lock:
+        if not download_progress_users:
+            download_progress.start()
+        download_progress_users += 1
+    try:
+        yield download_progress
+    finally:
+        with download_progress_lock:
+            download_progress_users -= 1
+            if not download_progress_users:
+                download_progress.stop()
+
+def sort_download(accessible_media: dict, state: DownloadState):
+    # every call is its own group within the download pipeline; so it only waits for & re-raises the errors of its own media
+    batch = object()
+
+    # hand the accessible_media to the download pipeline & wait for all of them to pass through it; accessible_media may also be a generator, that still fetches further media
+    with shared_download_progress() as progress:
+        try:
+            try:
+                for post in accessible_media:
+                    if not download_pipeline.submit(dict(post, progress = progress, state = state), group = batch):
+                        break
+            finally:
+                download_pipeline.join(group = batch) # re-raises DuplicateCountError & DownloadFailedError within the calling module
+        except DownloadFailedError as e:
+            output(2,'\n [13]ERROR','<red>', e.message)
+            input()
+            exit()
+        finally:
+            # make sure every finished download is persisted in the deduplication index
+            if dedup_index:
+                dedup_index.commit()
     # all functions call sort_download at the end; which means we leave this function open ended, so that the python executor can get back into executing in global space @ the end of the global space code / loop this function repetetively as seen in timeline code
 
+# on the page a resumed run continues at, only the media that was still pending when the last run stopped gets downloaded again
+# a page that wasn't started yet (pending is None) is downloaded as a whole
+def filter_resumed_media(accessible_media: list, checkpoint: dict):
+    if checkpoint.get('pending') is None:
+        return accessible_media
+    pending = set(checkpoint['pending'])
+    with dedup_lock:
+        finished = recent_photo_media_ids | recent_video_media_ids | recent_audio_media_ids
+    return [item for item in accessible_media if item['media_id'] in pending and item['media_id'] not in finished]
+
 # whole code uses this; whenever any json response needs to get parsed from fansly api
 def parse_media_info(media_info: dict, post_id = None):
     # initialize variables
@@ -1097,6 +1482,7 @@ def parse_media_info(media_info: dict, post_id = None):
 
                 # check if any .ts files are present
                 if any(segment.uri.endswith('.ts') for segment in playlist_obj.segments):
+                    playlist_cache.put(new_location_url, playlist_obj, location['metadata']['Policy'])
                     return True
                 else:
                     return False
@@ -1114,6 +1500,7 @@ def parse_media_info(media_info: dict, post_id = None):
 
                 # check if any .ts files are present
                 if any(segment.uri.endswith('.ts') for segment in playlist_obj.segments):
+                    playlist_cache.put(location_url, playlist_obj)
                     return True
                 else:
                     return False
@@ -1212,175 +1599,121 @@ def parse_media_info(media_info: dict, post_id = None):
 
 
 ## starting here: deduplication functionality
-# variables used: recent_photo_media_ids, recent_video_media_ids recent_audio_media_ids, recent_photo_hashes, recent_video_hashes, recent_audio_hashes
+# variables used: recent_photo_media_ids, recent_video_media_ids recent_audio_media_ids & the CreatorHashes of each creator
 # these are defined globally above sort_download() though
 
-# exclusively used for extracting media_id from pre-existing filenames
-def extract_media_id(filename: str, filepath: str):
-    # if media_id in filename
-    match = re.search(r'_id_(\d+)', filename)
-    if match:
-        return int(match.group(1))
-    # if media_id within Exif metadata
-    metadata_manager = MetadataManager()
-    metadata_manager.read_metadata(filepath=filepath)
-    file_metadata = metadata_manager.formatted_metadata()
-    if 'ID' in file_metadata:
-        return file_metadata['ID']
-    return
-
-# exclusively used for extracting hash from pre-existing filenames
-def extract_file_hash(filename: str, filepath: str):
-    # if filehash in filename
-    match = re.search(r'_hash_([a-fA-F0-9]+)', filename)
-    if match:
-        return match.group(1)
-    # if filehash within Exif metadata
-    metadata_manager = MetadataManager()
-    metadata_manager.read_metadata(filepath=filepath)
-    file_metadata = metadata_manager.formatted_metadata()
-    if 'HSH' in file_metadata:
-        return file_metadata['HSH']
-    return
-
-# exclusively used for adding hash to pre-existing filenames
-def add_hash_to_filename(filename: str, file_hash: str):
-    base_name, extension = os.path.splitext(filename)
-    hash_suffix = f"_hash_{file_hash}{extension}"
-
-    # adjust filename for 255 bytes filename limit, on all common operating systems
-    max_length = 250
-    if len(base_name) + len(hash_suffix) > max_length:
-        base_name = base_name[:max_length - len(hash_suffix)]
-    
-    return f"{base_name}{hash_suffix}"
-
-# exclusively used for hashing images from pre-existing download directories
-def hash_image(filepath: str):
-    try:
-        filename = os.path.basename(filepath)
-        file_extension = filename.rsplit('.')[1]
-
-        media_id = extract_media_id(filename, filepath)
-        if media_id:
-            recent_photo_media_ids.add(media_id)
-
-        existing_hash = extract_file_hash(filename, filepath)
-        if existing_hash:
-            recent_photo_hashes.add(existing_hash)
-        else:
-            # if image hash doesn't pre-exist, generate one using imagehash
-            img = Image.open(filepath)
-            file_hash = str(imagehash.phash(img, hash_size = 16))
-            recent_photo_hashes.add(file_hash)
-            img.close()
-            
-            metadata_manager = MetadataManager()
-            ext_sup = metadata_manager.is_file_supported(file_extension)
-            if ext_sup:
-                # if Exif metadata adding is supported for file extension
-                metadata_manager.set_filepath(filepath)
-                metadata_manager.set_custom_metadata("HSH", file_hash)
-                metadata_manager.add_metadata()
-                metadata_manager.save()
-            else:
-                # else fall back to adding filehash to filename
-                new_filename = add_hash_to_filename(filename, file_hash)
-                new_filepath = join(os.path.dirname(filepath), new_filename)
-                os.rename(filepath, new_filepath)
-                filepath = new_filepath
-    except FileExistsError:
-        os.remove(filepath)
-    except Exception:
-        output(2,'\n [15]ERROR','<red>', f"\nError processing image \'{filepath}\': {traceback.format_exc()}")
-
-# exclusively used for hashing videos & audio from pre-existing download directories
-def hash_audio_video(filepath: str, content_format: str):
-    global recent_video_hashes, recent_audio_hashes, recent_video_media_ids, recent_audio_media_ids
-    try:
-        filename = os.path.basename(filepath)
-        file_extension = filename.rsplit('.')[1]
-
-        media_id = extract_media_id(filename, filepath)
-        if media_id:
-            if content_format == 'video':
+# adds a media id & hash to the deduplication variables of their content format and records the file in the deduplication index
+# hashes are the CreatorHashes of the creator, whose folder the file is located in
+# videos & audio without a known md5 are remembered by their fingerprint instead; pass indexed = True for files that were loaded from the index
+def remember_media(filepath: str, content_format: str, media_id, file_hash, fingerprint: str = None, indexed: bool = False, hashes: CreatorHashes = None):
+    with dedup_lock:
+        if content_format == 'image':
+            if media_id:
+                recent_photo_media_ids.add(media_id)
+            if file_hash:
+                hashes.photo.add(file_hash)
+        elif content_format == 'video':
+            if media_id:
                 recent_video_media_ids.add(media_id)
-            elif content_format == 'audio':
+            if file_hash:
+                hashes.video.add(file_hash)
+            elif fingerprint and filepath:
+                hashes.video_fingerprints.setdefault(fingerprint, []).append(filepath)
+        elif content_format == 'audio':
+            if media_id:
                 recent_audio_media_ids.add(media_id)
-
-        existing_hash = extract_file_hash(filename, filepath)
-        if existing_hash:
-            if content_format == 'video':
-                recent_video_hashes.add(existing_hash)
-            elif content_format == 'audio':
-                recent_audio_hashes.add(existing_hash)
-        else:
-            # utilise md5 hashing for videos and audio
-            h = hashlib.md5()
-            with open(filepath, 'rb') as f:
-                while (part := f.read(1_048_576)):
-                    h.update(part)
-            file_hash = h.hexdigest()
-            if content_format == 'video':
-                recent_video_hashes.add(file_hash)
-            elif content_format == 'audio':
-                recent_audio_hashes.add(file_hash)
-            
-            metadata_manager = MetadataManager()
-            ext_sup = metadata_manager.is_file_supported(file_extension)
-            if ext_sup:
-                # if Exif metadata adding is supported for file extension
-                metadata_manager.set_filepath(filepath)
-                metadata_manager.set_custom_metadata("HSH", file_hash)
-                metadata_manager.add_metadata()
-                metadata_manager.save()
-            else:
-                # else fall back to adding filehash to filename
-                new_filename = add_hash_to_filename(filename, file_hash)
-                new_filepath = join(os.path.dirname(filepath), new_filename)
-                os.rename(filepath, new_filepath)
-                filepath = new_filepath
-    except FileExistsError:
-        os.remove(filepath)
-    except Exception:
-        output(2,'\n [16]ERROR','<red>', f"\nError processing {content_format} \'{filepath}\': {traceback.format_exc()}")
-
-# exclusively used for processing pre-existing files from previous downloads
-def process_file(file_path: str):
-    mimetype, _ = mimetypes.guess_type(file_path)
-    if mimetype is not None:
-        if mimetype.startswith('image'):
-            hash_image(file_path)
-        elif mimetype.startswith('video'):
-            hash_audio_video(file_path, content_format = 'video')
-        elif mimetype.startswith('audio'):
-            hash_audio_video(file_path, content_format = 'audio')
+            if file_hash:
+                hashes.audio.add(file_hash)
+            elif fingerprint and filepath:
+                hashes.audio_fingerprints.setdefault(fingerprint, []).append(filepath)
+    if dedup_index and filepath and not indexed:
+        dedup_index.add(filepath, media_id, file_hash, content_format, fingerprint)
+
+# second tier of video & audio deduplication; computes the full md5 of every pre-existing file with the same fingerprint as a download
+# the md5 is persisted in the deduplication index, so later runs re-use it
+def hash_colliding_media(fingerprint: str, recent_hashes: set, recent_fingerprints: dict):
+    with fingerprint_lock:
+        with dedup_lock:
+            colliding_files = recent_fingerprints.pop(fingerprint, [])
+        for filepath in colliding_files:
+            try:
+                file_hash = md5_file(filepath)
+            except OSError:
+                continue
+            with dedup_lock:
+                recent_hashes.add(file_hash)
+            if dedup_index:
+                dedup_index.set_hash(filepath, file_hash)
 
 # exclusively used for processing pre-existing folders from previous downloads
-def process_folder(folder_path: str):
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        for root, dirs, files in os.walk(folder_path):
-            file_paths = [join(root, file) for file in files]
-            executor.map(process_file, file_paths)
-    return True
+def process_folder(folder_path: str, hashes: CreatorHashes):
+    report = LibraryScanner(workers = scan_workers, use_stat_cache = incremental_rescan, use_manifest = folder_manifest).scan(folder_path, on_result = lambda *result: remember_media(*result, hashes = hashes))
 
+    for filepath, content_format, error in report.errors:
+        output(2,'\n [15]ERROR','<red>', f"\nError processing {content_format} \'{filepath}\': {error}")
 
-if os.path.isdir(generate_base_dir(config_username, download_mode)):
-    output(1,' Info','<light-blue>', f"Deduplication is automatically enabled for;\n{17*' '}{BASE_DIR_NAME}")
-    
-    if process_folder(BASE_DIR_NAME):
-        output(1,' Info','<light-blue>', f"Deduplication process is complete! Each new download will now be compared\
-            \n{17*' '}against a total of {len(recent_photo_hashes)} photo & {len(recent_video_hashes)} video hashes and corresponding media IDs.")
+    if incremental_rescan:
+        output(1,' Info','<light-blue>', f"Incremental rescan re-used {report.reused} unchanged files & re-processed {report.processed} new or modified files.")
+    if report.errors:
+        output(3,'\n WARNING','<yellow>', f"{len(report.errors)} pre-existing files could not be processed for deduplication.")
+    return True
 
-    # print("Recent Photo Hashes:", recent_photo_hashes)
-    # print("Recent Photo Media IDs:", recent_photo_media_ids)
-    # print("Recent Video Hashes:", recent_video_hashes)
-    # print("Recent Video Media IDs:", recent_video_media_ids)
 
-    if randint(1,100) <= 19:
-        output(3, '\n WARNING', '<yellow>', f"Reminder; If you remove id_NUMBERS or hash_STRING from filenames of previously downloaded files,\
-            \n{20*' '}they will no longer be compatible with fansly downloaders deduplication algorithm. Generally modifying the filename,\
-            \n{20*' '}is not advised and might cause unexpected behaviour.")
+generate_base_dir(config_usernames[0], download_mode)
+
+# the deduplication index & pagination checkpoints live in the download root; next to all creator folders
+download_root = getcwd() if 'Local_dir' in download_directory else download_directory
+dedup_index = DedupIndex(download_root) if utilise_dedup_index else None
+pagination_checkpoint = PaginationCheckpoint(download_root)
+
+# re-fill the deduplication variables with the content of a pre-existing download folder, of the given creator
+def load_deduplication(folder_path: str, creator_name: str):
+    hashes = hashes_for(creator_name)
+    if os.path.isdir(folder_path):
+        output(1,' Info','<light-blue>', f"Deduplication is automatically enabled for;\n{17*' '}{folder_path}")
+
+        # re-fill the deduplication variables from the index with one query; only scan the whole folder, if no scan of it ever completed
+        indexed_files = dedup_index.load(folder_path) if dedup_index and dedup_index.is_scanned(folder_path) else None
+        if indexed_files is not None:
+            for filepath, media_id, file_hash, content_format, fingerprint in indexed_files:
+                remember_media(filepath, content_format, media_id, file_hash, fingerprint, indexed = True, hashes = hashes)
+            output(1,' Info','<light-blue>', f"Deduplication index loaded {len(indexed_files)} previously downloaded files! Each new download will now be compared\
+                \n{17*' '}against a total of {len(hashes.photo)} photo & {len(hashes.video)} video hashes and corresponding media IDs.\
+                \n{17*' '}Delete \'{dedup_index.db_path}\' to force a full re-scan of the download folder.")
+        elif process_folder(folder_path, hashes):
+            # from now on every download into this folder gets indexed, so the index stays complete
+            if dedup_index:
+                dedup_index.mark_scanned(folder_path)
+            output(1,' Info','<light-blue>', f"Deduplication process is complete! Each new download will now be compared\
+                \n{17*' '}against a total of {len(hashes.photo)} photo & {len(hashes.video)} video hashes and corresponding media IDs.")
+
+        # print("Recent Photo Hashes:", hashes.photo)
+        # print("Recent Photo Media IDs:", recent_photo_media_ids)
+        # print("Recent Video Hashes:", hashes.video)
+        # print("Recent Video Media IDs:", recent_video_media_ids)
+
+        if randint(1,100) <= 19:
+            output(3, '\n WARNING', '<yellow>', f"Reminder; If you remove id_NUMBERS or hash_STRING from filenames of previously downloaded files,\
+                \n{20*' '}they will no longer be compatible with fansly downloaders deduplication algorithm. Generally modifying the filename,\
+                \n{20*' '}is not advised and might cause unexpected behaviour.")
+
+
+# in batch mode; the folders of all creators are loaded up-front, as the creators get downloaded at the same time
+load_deduplication(BASE_DIR_NAME, config_usernames[0])
+if len(config_usernames) > 1 and any(['Message' in download_mode, 'Timeline' in download_mode, 'Normal' in download_mode]):
+    for username in config_usernames[1:]:
+        load_deduplication(generate_base_dir(username, download_mode), username)
+
+# long-lived download pipeline, shared by every module; the network stage keeps downloading, while hashing, metadata tagging & file promotion overlap with it
+# its worker threads are only started after the folder scans above, as those fork worker processes
+# pyexiv2 is not thread-safe; tagging workers only queue their writes to the metadata service, which performs them in batches on its own thread
+download_pipeline = StagePipeline([
+    ('fetch', fetch_media_item, download_workers),
+    ('hash', hash_media_item, hash_workers),
+    ('tag', tag_media_item, tag_workers),
+    ('write', write_media_item, write_workers),
+], queue_depth = pipeline_queue_depth, max_pending = network_concurrency, on_drop = discard_media_item)
+
 
 
 ## starting here: stuff that literally every download mode uses, which should be executed at the very first everytime
@@ -1391,6 +1724,12 @@ if download_mode:
 
     if download_media_previews:output(3,'\n WARNING','<yellow>', 'Previews downloading is enabled; repetitive and/or emoji spammed media might be downloaded!')
 
+    # if started with --startup-timings; report how long it took to get here, right before the first fansly api request
+    if '--startup-timings' in sys.argv:
+        lazy_imports = ', '.join(f"{name} {seconds:.3f}s" for name, seconds in sorted(import_timings.items(), key = lambda item: -item[1])) or 'none'
+        output(1,' Info','<light-blue>', f"Startup took {time.perf_counter() - startup_clock:.3f}s; {startup_import_seconds:.3f}s of it on eager imports.\
+            \n{17*' '}Lazily imported so far: {lazy_imports}")
+
 
 
 ## starting here: download_mode = Single
@@ -1455,13 +1794,15 @@ if download_mode == 'Single':
             the user could've decide to just download some random creators post instead of the one that he currently
             set as creator for > TargetCreator > username in config.ini
             """
-            generate_base_dir(creator_username, module_requested_by = 'Single')
+            # deduplicates against the folder, that was loaded at startup
+            single_state = DownloadState(creator_username, hashes = hashes_for(config_usernames[0]))
+            single_state.base_dir = generate_base_dir(creator_username, module_requested_by = 'Single')
         
             try:
                 # download it
-                sort_download(accessible_media)
+                sort_download(accessible_media, single_state)
             except DuplicateCountError:
-                output(1,' Info','<light-blue>', f"Already downloaded all possible Single Post content! [Duplicate threshold exceeded {DUPLICATE_THRESHOLD}]")
+                output(1,' Info','<light-blue>', f"Already downloaded all possible Single Post content! [Duplicate threshold exceeded {single_state.duplicate_threshold}]")
             except Exception:
                 output(2,'\n [19]ERROR','<red>', f"Unexpected error during sorting Single Post download; \n{traceback.format_exc()}")
                 input('\n Press Enter to attempt to continue ..')
@@ -1480,274 +1821,381 @@ if download_mode == 'Single':
 if 'Collection' in download_mode:
     output(1,'\n Info','<light-blue>', f"Starting Collections sequence. Buckle up and enjoy the ride!")
 
-    # send a first request to get all available "accountMediaId" ids, which are basically media ids of every graphic listed on /collections
-    collections_req = sess.get('https://apiv3.fansly.com/api/v1/account/media/orders/', params={'limit': '9999','offset': '0','ngsw-bypass': 'true'}, headers=headers)
-    if collections_req.ok:
-        collections_req = collections_req.json()
-        
-        # format all ids from /account/media/orders (collections)
-        accountMediaIds = ','.join([order['accountMediaId'] for order in collections_req['response']['accountMediaOrders']])
-        
-        # input them into /media?ids= to get all relevant information about each purchased media in a 2nd request
-        post_object = sess.get(f"https://apiv3.fansly.com/api/v1/account/media?ids={accountMediaIds}", headers=headers)
-        post_object = post_object.json()
-        
-        contained_posts = []
-        
-        for obj in post_object['response']:
+    # fetches a single page of /account/media/orders (collections); returns the "accountMediaId" ids on it, which are basically media ids of every graphic listed on /collections
+    def fetch_collection_orders(offset: int):
+        collections_req = sess.get('https://apiv3.fansly.com/api/v1/account/media/orders/', params={'limit': str(COLLECTION_ORDERS_PAGE_SIZE),'offset': str(offset),'ngsw-bypass': 'true'}, headers=headers)
+        collections_req.raise_for_status()
+        orders = collections_req.json()['response']['accountMediaOrders']
+        next_offset = offset + len(orders) if len(orders) == COLLECTION_ORDERS_PAGE_SIZE else None
+        return [order['accountMediaId'] for order in orders], next_offset
+
+    # input a batch of ids into /media?ids= to get all relevant information about each purchased media
+    def fetch_collection_media(account_media_ids: list):
+        post_object = sess.get(f"https://apiv3.fansly.com/api/v1/account/media?ids={','.join(account_media_ids)}", headers=headers)
+        post_object.raise_for_status()
+        return post_object.json()['response']
+
+    # yields the accessible media of the collection, as soon as the batch it is part of arrived; so downloading starts long before the last batch is fetched
+    def stream_collection_media(counts: dict):
+        collection_orders = CursorPrefetcher(fetch_collection_orders, 0, depth = 1)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers = COLLECTION_FETCH_WORKERS)
+        pending = {}
+
+        def parse_batch(future):
+            account_media_ids = pending.pop(future)
             try:
-                # add details into a list
-                contained_posts += [parse_media_info(obj)]
+                media_batch = future.result()
             except Exception:
-                output(2,'\n [21]ERROR','<red>', f"Unexpected error during parsing Collections content; \n{traceback.format_exc()}")
-                input('\n Press Enter to attempt to continue ..')
-        
-        # count only amount of scrapable media (is_preview check not really necessary since everything in collections is always paid, but w/e)
-        accessible_media = [item for item in contained_posts if item.get('download_url') and (item.get('is_preview') == download_media_previews or not item.get('is_preview'))]
-    
-        output(1,' Info','<light-blue>', f"Amount of Media in Media Collection: {len(post_object['response'])} (scrapable: {len(accessible_media)})")
-        
-        generate_base_dir(config_username, module_requested_by = 'Collection')
-        
+                output(2,'\n [38]ERROR','<red>', f"Failed fetching the details of {len(account_media_ids)} Collections media; skipping them. \n{traceback.format_exc()}")
+                return []
+
+            contained_posts = []
+            for obj in media_batch:
+                try:
+                    # add details into a list
+                    contained_posts += [parse_media_info(obj)]
+                except Exception:
+                    output(2,'\n [21]ERROR','<red>', f"Unexpected error during parsing Collections content; \n{traceback.format_exc()}")
+                    input('\n Press Enter to attempt to continue ..')
+
+            # count only amount of scrapable media (is_preview check not really necessary since everything in collections is always paid, but w/e)
+            accessible_media = [item for item in contained_posts if item.get('download_url') and (item.get('is_preview') == download_media_previews or not item.get('is_preview'))]
+            counts['total'] += len(media_batch)
+            counts['scrapable'] += len(accessible_media)
+            return accessible_media
+
         try:
-            # download it
-            sort_download(accessible_media)
-        except DuplicateCountError:
-            output(1,' Info','<light-blue>', f"Already downloaded all possible Collections content! [Duplicate threshold exceeded {DUPLICATE_THRESHOLD}]")
-        except Exception:
-            output(2,'\n [22]ERROR','<red>', f"Unexpected error during sorting Collections download; \n{traceback.format_exc()}")
-            input('\n Press Enter to attempt to continue ..')
+            while (collection_page := collection_orders.next_page()):
+                _, account_media_ids = collection_page
+                for index in range(0, len(account_media_ids), COLLECTION_BATCH_SIZE):
+                    batch = account_media_ids[index:index + COLLECTION_BATCH_SIZE]
+                    pending[executor.submit(fetch_collection_media, batch)] = batch
+
+                # hand over the batches that already arrived & keep the amount of batches in flight bounded
+                while pending:
+                    done, _ = concurrent.futures.wait(list(pending), timeout = 0 if len(pending) <= COLLECTION_FETCH_WORKERS * 2 else None, return_when = concurrent.futures.FIRST_COMPLETED)
+                    if not done:
+                        break
+                    for future in done:
+                        yield from parse_batch(future)
 
-    else:
-        output(2,'\n [23]ERROR','<red>', f"Failed Collections download. Fetch collections request, response code: {collections_req.status_code}\n{collections_req.text}")
+            for future in concurrent.futures.as_completed(list(pending)):
+                yield from parse_batch(future)
+        finally:
+            collection_orders.close()
+            executor.shutdown(wait = False, cancel_futures = True)
+
+    collection_state = DownloadState(config_username, hashes = hashes_for(config_usernames[0]))
+    collection_state.base_dir = generate_base_dir(config_username, module_requested_by = 'Collection')
+
+    collection_counts = {'total': 0, 'scrapable': 0}
+    try:
+        # download it, while the rest of the collection is still being fetched
+        sort_download(stream_collection_media(collection_counts), collection_state)
+        output(1,' Info','<light-blue>', f"Amount of Media in Media Collection: {collection_counts['total']} (scrapable: {collection_counts['scrapable']})")
+    except DuplicateCountError:
+        output(1,' Info','<light-blue>', f"Already downloaded all possible Collections content! [Duplicate threshold exceeded {collection_state.duplicate_threshold}]")
+    except requests.HTTPError as e:
+        output(2,'\n [23]ERROR','<red>', f"Failed Collections download. Fetch collections request, response code: {e.response.status_code}\n{e.response.text}")
+        input('\n Press Enter to attempt to continue ..')
+    except Exception:
+        output(2,'\n [22]ERROR','<red>', f"Unexpected error during sorting Collections download; \n{traceback.format_exc()}")
         input('\n Press Enter to attempt to continue ..')
 
 
 
 
-# here comes stuff that is required by Messages AND Timeline - so this is like a 'shared section'
-if any(['Message' in download_mode, 'Timeline' in download_mode, 'Normal' in download_mode]):
-    try:
-        raw_req = sess.get(f"https://apiv3.fansly.com/api/v1/account?usernames={config_username}", headers=headers)
-        acc_req = raw_req.json()['response'][0]
-        creator_id = acc_req['id']
-    except KeyError as e:
-        if raw_req.status_code == 401:
-            output(2,'\n [24]ERROR','<red>', f"API returned unauthorized. This is most likely because of a wrong authorization token, in the configuration file.\n{21*' '}Used authorization token: \'{config_token}\'")
-        else:
-            output(2,'\n [25]ERROR','<red>', 'Bad response from fansly API. Please make sure your configuration file is not malformed.')
-        print('\n'+str(e))
-        print(raw_req.text)
-        input('\nPress Enter to close ...')
-        exit()
-    except IndexError as e:
-        output(2,'\n [26]ERROR','<red>', 'Bad response from fansly API. Please make sure your configuration file is not malformed; most likely misspelled the creator name.')
-        print('\n'+str(e))
-        print(raw_req.text)
-        input('\nPress Enter to close ...')
-        exit()
+# generate_base_dir() works on the global BASE_DIR_NAME; creators of a batch have to take turns calling it
+base_dir_lock = threading.RLock()
 
-    # below only needed by timeline; but wouldn't work without acc_req so it's here
-    # determine if followed
-    try:
-        following = acc_req['following']
-    except KeyError:
-        following = False
+# downloads the Messages and / or Timeline of a single creator, into its own DownloadState
+def download_creator(state: DownloadState):
+    # here comes stuff that is required by Messages AND Timeline - so this is like a 'shared section'
+    if any(['Message' in download_mode, 'Timeline' in download_mode, 'Normal' in download_mode]):
+        try:
+            raw_req = sess.get(f"https://apiv3.fansly.com/api/v1/account?usernames={state.creator_name}", headers=headers)
+            acc_req = raw_req.json()['response'][0]
+            creator_id = acc_req['id']
+        except KeyError as e:
+            if raw_req.status_code == 401:
+                output(2,'\n [24]ERROR','<red>', f"API returned unauthorized. This is most likely because of a wrong authorization token, in the configuration file.\n{21*' '}Used authorization token: \'{config_token}\'")
+            else:
+                output(2,'\n [25]ERROR','<red>', 'Bad response from fansly API. Please make sure your configuration file is not malformed.')
+            print('\n'+str(e))
+            print(raw_req.text)
+            input('\nPress Enter to close ...')
+            exit()
+        except IndexError as e:
+            output(2,'\n [26]ERROR','<red>', 'Bad response from fansly API. Please make sure your configuration file is not malformed; most likely misspelled the creator name.')
+            print('\n'+str(e))
+            print(raw_req.text)
+            input('\nPress Enter to close ...')
+            exit()
+
+        # below only needed by timeline; but wouldn't work without acc_req so it's here
+        # determine if followed
+        try:
+            following = acc_req['following']
+        except KeyError:
+            following = False
 
-    # determine if subscribed
-    try:
-        subscribed = acc_req['subscribed']
-    except KeyError:
-        subscribed = False
-    
-    # intentionally only put pictures into try / except block - its enough
-    try:
-        total_timeline_pictures = acc_req['timelineStats']['imageCount']
-    except KeyError:
-        output(2,'\n [27]ERROR','<red>', f"Can not get timelineStats for creator username \'{config_username}\'; most likely misspelled it!")
-        input('\nPress Enter to close ...')
-        exit()
-    total_timeline_videos = acc_req['timelineStats']['videoCount']
+        # determine if subscribed
+        try:
+            subscribed = acc_req['subscribed']
+        except KeyError:
+            subscribed = False
+
+        # intentionally only put pictures into try / except block - its enough
+        try:
+            total_timeline_pictures = acc_req['timelineStats']['imageCount']
+        except KeyError:
+            output(2,'\n [27]ERROR','<red>', f"Can not get timelineStats for creator username \'{state.creator_name}\'; most likely misspelled it!")
+            input('\nPress Enter to close ...')
+            exit()
+        total_timeline_videos = acc_req['timelineStats']['videoCount']
 
-    # overwrite base dup threshold with custom 20% of total timeline content
-    DUPLICATE_THRESHOLD = int(0.2 * int(total_timeline_pictures + total_timeline_videos))
+        # overwrite base dup threshold with custom 20% of total timeline content
+        state.duplicate_threshold = int(0.2 * int(total_timeline_pictures + total_timeline_videos))
 
-    # timeline & messages will always use the creator name from config.ini, so we'll leave this here
-    output(1,' Info','<light-blue>', f"Targeted creator: \'{config_username}\'")
+        # timeline & messages will always use the creator name from config.ini, so we'll leave this here
+        output(1,' Info','<light-blue>', f"Targeted creator: \'{state.creator_name}\'")
 
 
 
-## starting here: download_mode = Message(s)
-if any(['Message' in download_mode, 'Normal' in download_mode]):
-    output(1,' \n Info','<light-blue>', f"Initiating Messages procedure. Standby for results.")
-    
-    groups_req = sess.get('https://apiv3.fansly.com/api/v1/group', headers=headers)
+    ## starting here: download_mode = Message(s)
+    if any(['Message' in download_mode, 'Normal' in download_mode]):
+        output(1,' \n Info','<light-blue>', f"Initiating Messages procedure. Standby for results.")
+
+        groups_req = sess.get('https://apiv3.fansly.com/api/v1/group', headers=headers)
 
-    if groups_req.ok:
-        groups_req = groups_req.json()['response']['groups']
+        if groups_req.ok:
+            groups_req = groups_req.json()['response']['groups']
 
-        # go through messages and check if we even have a chat history with the creator
-        group_id = None
-        for group in groups_req:
-            for user in group['users']:
-                if user['userId'] == creator_id:
-                    group_id = group['id']
+            # go through messages and check if we even have a chat history with the creator
+            group_id = None
+            for group in groups_req:
+                for user in group['users']:
+                    if user['userId'] == creator_id:
+                        group_id = group['id']
+                        break
+                if group_id:
                     break
+
+            # only if we do have a message ("group") with the creator
             if group_id:
-                break
+                # continue at the page, the last run got interrupted on
+                resumed_messages = pagination_checkpoint.get(creator_id, 'messages') if resume_downloads else None
+                if resumed_messages:
+                    output(1,' Info','<light-blue>', f"Resuming Messages download at cursor: {resumed_messages['cursor']}")
+
+                msg_cursor = resumed_messages['cursor'] if resumed_messages else 0
+                while True:
+                    messages_req = sess.get('https://apiv3.fansly.com/api/v1/message', headers = headers, params = {'groupId': group_id, 'before': msg_cursor, 'limit': '25', 'ngsw-bypass': 'true'} if msg_cursor else {'groupId': group_id, 'limit': '25', 'ngsw-bypass': 'true'})
+
+                    if messages_req.status_code == 200:
+                        accessible_media = None
+                        contained_posts = []
+
+                        # post object contains: messages, accountMedia, accountMediaBundles, tips, tipGoals, stories
+                        post_object = messages_req.json()['response']
+
+                        # parse relevant details about the post
+                        if not accessible_media:
+                            # loop through the list of dictionaries and find the highest quality media URL for each one
+                            for obj in post_object['accountMedia']:
+                                try:
+                                    # add details into a list
+                                    contained_posts += [parse_media_info(obj)]
+                                except Exception:
+                                    output(2,'\n [28]ERROR','<red>', f"Unexpected error during parsing Messages content; \n{traceback.format_exc()}")
+                                    input('\n Press Enter to attempt to continue ..')
+
+                            # summarise all scrapable & wanted media
+                            accessible_media = [item for item in contained_posts if item.get('download_url') and (item.get('is_preview') == download_media_previews or not item.get('is_preview'))]
+
+                            total_accessible_messages_content = len(accessible_media)
+
+                            # overwrite base dup threshold with 20% of total accessible content in messages
+                            state.duplicate_threshold = int(0.2 * total_accessible_messages_content)
+
+                            # at this point we have already parsed the whole post object and determined what is scrapable with the code above
+                            output(1,' Info','<light-blue>', f"Amount of Media in Messages with {state.creator_name}: {len(post_object['accountMedia'])} (scrapable: {total_accessible_messages_content})")
+
+                            with base_dir_lock:
+                                state.base_dir = generate_base_dir(state.creator_name, module_requested_by = 'Messages')
+
+                            if resumed_messages and resumed_messages['cursor'] == msg_cursor:
+                                accessible_media = filter_resumed_media(accessible_media, resumed_messages)
+                            pagination_checkpoint.save(creator_id, 'messages', msg_cursor, [item['media_id'] for item in accessible_media])
 
-        # only if we do have a message ("group") with the creator
-        if group_id:
-            msg_cursor = 0
-            while True:
-                messages_req = sess.get('https://apiv3.fansly.com/api/v1/message', headers = headers, params = {'groupId': group_id, 'before': msg_cursor, 'limit': '25', 'ngsw-bypass': 'true'} if msg_cursor else {'groupId': group_id, 'limit': '25', 'ngsw-bypass': 'true'})
-
-                if messages_req.status_code == 200:
-                    accessible_media = None
-                    contained_posts = []
-                
-                    # post object contains: messages, accountMedia, accountMediaBundles, tips, tipGoals, stories
-                    post_object = messages_req.json()['response']
-
-                    # parse relevant details about the post
-                    if not accessible_media:
-                        # loop through the list of dictionaries and find the highest quality media URL for each one
-                        for obj in post_object['accountMedia']:
                             try:
-                                # add details into a list
-                                contained_posts += [parse_media_info(obj)]
+                                # download it
+                                sort_download(accessible_media, state)
+                            except DuplicateCountError:
+                                output(1,' Info','<light-blue>', f"Already downloaded all possible Messages content! [Duplicate threshold exceeded {state.duplicate_threshold}]")
                             except Exception:
-                                output(2,'\n [28]ERROR','<red>', f"Unexpected error during parsing Messages content; \n{traceback.format_exc()}")
+                                output(2,'\n [29]ERROR','<red>', f"Unexpected error during sorting Messages download; \n{traceback.format_exc()}")
                                 input('\n Press Enter to attempt to continue ..')
-                
-                        # summarise all scrapable & wanted media
-                        accessible_media = [item for item in contained_posts if item.get('download_url') and (item.get('is_preview') == download_media_previews or not item.get('is_preview'))]
-
-                        total_accessible_messages_content = len(accessible_media)
-
-                        # overwrite base dup threshold with 20% of total accessible content in messages
-                        DUPLICATE_THRESHOLD = int(0.2 * total_accessible_messages_content)
-
-                        # at this point we have already parsed the whole post object and determined what is scrapable with the code above
-                        output(1,' Info','<light-blue>', f"Amount of Media in Messages with {config_username}: {len(post_object['accountMedia'])} (scrapable: {total_accessible_messages_content})")
-
-                        generate_base_dir(config_username, module_requested_by = 'Messages')
-
-                        try:
-                            # download it
-                            sort_download(accessible_media)
-                        except DuplicateCountError:
-                            output(1,' Info','<light-blue>', f"Already downloaded all possible Messages content! [Duplicate threshold exceeded {DUPLICATE_THRESHOLD}]")
-                        except Exception:
-                            output(2,'\n [29]ERROR','<red>', f"Unexpected error during sorting Messages download; \n{traceback.format_exc()}")
-                            input('\n Press Enter to attempt to continue ..')
-
-                        # get next cursor
-                        try:
-                            msg_cursor = post_object['messages'][-1]['id']
-                        except IndexError:
-                            break # break if end is reached
-                else:
-                    output(2,'\n [30]ERROR','<red>', f"Failed messages download. messages_req failed with response code: {messages_req.status_code}\n{messages_req.text}")
 
-        elif group_id is None:
-            output(2, ' WARNING', '<yellow>', f"Could not find a chat history with {config_username}; skipping messages download ..")
-    else:
-        output(2,'\n [31]ERROR','<red>', f"Failed Messages download. Fetch Messages request, response code: {groups_req.status_code}\n{groups_req.text}")
-        input('\n Press Enter to attempt to continue ..')
+                            # get next cursor
+                            try:
+                                msg_cursor = post_object['messages'][-1]['id']
+                                pagination_checkpoint.save(creator_id, 'messages', msg_cursor, None)
+                            except IndexError:
+                                pagination_checkpoint.clear(creator_id, 'messages')
+                                break # break if end is reached
+                    else:
+                        output(2,'\n [30]ERROR','<red>', f"Failed messages download. messages_req failed with response code: {messages_req.status_code}\n{messages_req.text}")
 
+            elif group_id is None:
+                output(2, ' WARNING', '<yellow>', f"Could not find a chat history with {state.creator_name}; skipping messages download ..")
+        else:
+            output(2,'\n [31]ERROR','<red>', f"Failed Messages download. Fetch Messages request, response code: {groups_req.status_code}\n{groups_req.text}")
+            input('\n Press Enter to attempt to continue ..')
 
 
-## starting here: download_mode = Timeline
-if any(['Timeline' in download_mode, 'Normal' in download_mode]):
-    output(1,'\n Info','<light-blue>', f"Executing Timeline functionality. Anticipate remarkable outcomes!")
 
-    # this has to be up here so it doesn't get looped
-    generate_base_dir(config_username, module_requested_by = 'Timeline')
+    ## starting here: download_mode = Timeline
+    if any(['Timeline' in download_mode, 'Normal' in download_mode]):
+        output(1,'\n Info','<light-blue>', f"Executing Timeline functionality. Anticipate remarkable outcomes!")
 
-    timeline_cursor = 0
-    while True:
-        if timeline_cursor == 0:
-            output(1, '\n Info', '<light-blue>', "Inspecting most recent Timeline cursor")
-        else:
-            output(1, '\n Info', '<light-blue>', f"Inspecting Timeline cursor: {timeline_cursor}")
+        # this has to be up here so it doesn't get looped
+        with base_dir_lock:
+            state.base_dir = generate_base_dir(state.creator_name, module_requested_by = 'Timeline')
 
-        try:
+        # fetches & parses a single Timeline cursor; runs in the prefetchers background thread, so parsing errors are only collected here
+        def fetch_timeline_page(timeline_cursor):
             timeline_req = sess.get(f"https://apiv3.fansly.com/api/v1/timelinenew/{creator_id}?before={timeline_cursor}&after=0&wallId=&contentSearch=&ngsw-bypass=true", headers=headers)
-            if timeline_req.status_code == 200:
-                accessible_media = None
-                contained_posts = []
+            if timeline_req.status_code != 200:
+                return None, timeline_cursor # try the same cursor again
+
+            post_object = timeline_req.json()['response']
+
+            # loop through the list of dictionaries and find the highest quality media URL for each one
+            contained_posts, parse_errors = [], []
+            for obj in post_object['accountMedia']:
+                try:
+                    # add details into a list
+                    contained_posts += [parse_media_info(obj)]
+                except Exception:
+                    parse_errors.append(traceback.format_exc())
+
+            # get next timeline_cursor
+            try:
+                next_cursor = post_object['posts'][-1]['id']
+            except IndexError:
+                next_cursor = None # end is reached
+
+            return (post_object, contained_posts, parse_errors, next_cursor), next_cursor
+
+        # continue at the page, the last run got interrupted on
+        resumed_timeline = pagination_checkpoint.get(creator_id, 'timeline') if resume_downloads else None
+        if resumed_timeline:
+            output(1,' Info','<light-blue>', f"Resuming Timeline download at cursor: {resumed_timeline['cursor']}")
+
+        # the next pages are fetched & parsed in the background, while the current one downloads
+        timeline_pages = CursorPrefetcher(fetch_timeline_page, resumed_timeline['cursor'] if resumed_timeline else 0, depth = timeline_prefetch_depth)
+        while True:
+            try:
+                timeline_page = timeline_pages.next_page()
+                if not timeline_page:
+                    pagination_checkpoint.clear(creator_id, 'timeline')
+                    break # break the whole while loop, if end is reached
+                timeline_cursor, page = timeline_page
+
+                if timeline_cursor == 0:
+                    output(1, '\n Info', '<light-blue>', "Inspecting most recent Timeline cursor")
+                else:
+                    output(1, '\n Info', '<light-blue>', f"Inspecting Timeline cursor: {timeline_cursor}")
+
+                if page:
+                    post_object, contained_posts, parse_errors, next_cursor = page
+
+                    for parse_error in parse_errors:
+                        output(2,'\n [32]ERROR','<red>', f"Unexpected error during parsing Timeline content; \n{parse_error}")
+                        input('\n Press Enter to attempt to continue ..')
 
-                post_object = timeline_req.json()['response']
-        
-                # parse relevant details about the post
-                if not accessible_media:
-                    # loop through the list of dictionaries and find the highest quality media URL for each one
-                    for obj in post_object['accountMedia']:
-                        try:
-                            # add details into a list
-                            contained_posts += [parse_media_info(obj)]
-                        except Exception:
-                            output(2,'\n [32]ERROR','<red>', f"Unexpected error during parsing Timeline content; \n{traceback.format_exc()}")
-                            input('\n Press Enter to attempt to continue ..')
-        
                     # summarise all scrapable & wanted media
                     accessible_media = [item for item in contained_posts if item.get('download_url') and (item.get('is_preview') == download_media_previews or not item.get('is_preview'))]
-    
+
                     # at this point we have already parsed the whole post object and determined what is scrapable with the code above
                     output(1,' Info','<light-blue>', f"Amount of Media in current cursor: {len(post_object['accountMedia'])} (scrapable: {len(accessible_media)})")
 
+                    if resumed_timeline and resumed_timeline['cursor'] == timeline_cursor:
+                        accessible_media = filter_resumed_media(accessible_media, resumed_timeline)
+                    pagination_checkpoint.save(creator_id, 'timeline', timeline_cursor, [item['media_id'] for item in accessible_media])
+
                     try:
                         # download it
-                        sort_download(accessible_media)
+                        sort_download(accessible_media, state)
+                        # the page is complete; a resumed run continues at the next one
+                        if next_cursor:
+                            pagination_checkpoint.save(creator_id, 'timeline', next_cursor, None)
+                        else:
+                            pagination_checkpoint.clear(creator_id, 'timeline')
                     except DuplicateCountError:
-                        output(1,' Info','<light-blue>', f"Already downloaded all possible Timeline content! [Duplicate threshold exceeded {DUPLICATE_THRESHOLD}]")
+                        output(1,' Info','<light-blue>', f"Already downloaded all possible Timeline content! [Duplicate threshold exceeded {state.duplicate_threshold}]")
+                        pagination_checkpoint.clear(creator_id, 'timeline')
                         break
                     except Exception:
                         output(2,'\n [33]ERROR','<red>', f"Unexpected error during sorting Timeline download: \n{traceback.format_exc()}")
                         input('\n Press Enter to attempt to continue ..')
 
-                # get next timeline_cursor
-                try:
-                    timeline_cursor = post_object['posts'][-1]['id']
-                except IndexError:
-                    break  # break the whole while loop, if end is reached
-                except Exception:
-                    print('\n'+traceback.format_exc())
-                    output(2,'\n [34]ERROR','<red>', 'Please copy & paste this on GitHub > Issues & provide a short explanation.')
-                    input('\nPress Enter to close ...')
-                    exit()
+            except KeyError:
+                output(2,'\n [35]ERROR','<red>', "Couldn\'t find any scrapable media at all!\
+                    \n This most likely happend because you\'re not following the creator, your authorisation token is wrong\
+                    \n or the creator is not providing unlocked content.")
+                input('\n Press Enter to attempt to continue ..')
+            except Exception:
+                output(2,'\n [36]ERROR','<red>', f"Unexpected error during Timeline download: \n{traceback.format_exc()}")
+                input('\n Press Enter to attempt to continue ..')
 
-        except KeyError:
-            output(2,'\n [35]ERROR','<red>', "Couldn\'t find any scrapable media at all!\
-                \n This most likely happend because you\'re not following the creator, your authorisation token is wrong\
-                \n or the creator is not providing unlocked content.")
-            input('\n Press Enter to attempt to continue ..')
-        except Exception:
-            output(2,'\n [36]ERROR','<red>', f"Unexpected error during Timeline download: \n{traceback.format_exc()}")
-            input('\n Press Enter to attempt to continue ..')
+        # stop prefetching cursors, that won't be downloaded anymore
+        timeline_pages.close()
 
-    # check if atleast 20% of timeline was scraped; exluding the case when all the media was declined as duplicates
-    print('') # intentional empty print
-    issue = False
-    if pic_count <= total_timeline_pictures * 0.2 and duplicate_count <= total_timeline_pictures * 0.2:
-        output(3,'\n WARNING','<yellow>', f"Low amount of Pictures scraped. Creators total Pictures: {total_timeline_pictures} | Downloaded: {pic_count}")
-        issue = True
-    
-    if vid_count <= total_timeline_videos * 0.2 and duplicate_count <= total_timeline_videos * 0.2:
-        output(3,'\n WARNING','<yellow>', f"Low amount of Videos scraped. Creators total Videos: {total_timeline_videos} | Downloaded: {vid_count}")
-        issue = True
-    
-    if issue:
-        if not following:
-            print(f"{20*' '}Follow the creator; to be able to scrape more media!")
-        
-        if not subscribed:
-            print(f"{20*' '}Subscribe to the creator; if you would like to get the entire content.")
-        
-        if not download_media_previews:
-            print(f"{20*' '}Try setting download_media_previews to True in the config.ini file. Doing so, will help if the creator has marked all his content as previews.")
-        print('')
+        # check if atleast 20% of timeline was scraped; exluding the case when all the media was declined as duplicates
+        print('') # intentional empty print
+        issue = False
+        if state.pic_count <= total_timeline_pictures * 0.2 and state.duplicate_count <= total_timeline_pictures * 0.2:
+            output(3,'\n WARNING','<yellow>', f"Low amount of Pictures scraped. Creators total Pictures: {total_timeline_pictures} | Downloaded: {state.pic_count}")
+            issue = True
+
+        if state.vid_count <= total_timeline_videos * 0.2 and state.duplicate_count <= total_timeline_videos * 0.2:
+            output(3,'\n WARNING','<yellow>', f"Low amount of Videos scraped. Creators total Videos: {total_timeline_videos} | Downloaded: {state.vid_count}")
+            issue = True
+
+        if issue:
+            if not following:
+                print(f"{20*' '}Follow the creator; to be able to scrape more media!")
+
+            if not subscribed:
+                print(f"{20*' '}Subscribe to the creator; if you would like to get the entire content.")
+
+            if not download_media_previews:
+                print(f"{20*' '}Try setting download_media_previews to True in the config.ini file. Doing so, will help if the creator has marked all his content as previews.")
+            print('')
+
+
+# a comma separated list of usernames in config.ini > TargetedCreator > Username enables batch mode;
+# creators share the session, rate limiter & download pipeline and a few of them get downloaded at once, so one creators page pacing doesn't leave the pipeline idle
+creator_states = []
+if any(['Message' in download_mode, 'Timeline' in download_mode, 'Normal' in download_mode]):
+    creator_states = [DownloadState(username) for username in config_usernames]
+
+    if len(creator_states) == 1:
+        download_creator(creator_states[0])
+    else:
+        output(1,'\n Info','<light-blue>', f"Batch downloading {len(creator_states)} creators, {batch_creator_workers} at a time: {', '.join(config_usernames)}")
+        with concurrent.futures.ThreadPoolExecutor(max_workers = batch_creator_workers) as executor:
+            creator_futures = {executor.submit(download_creator, state): state for state in creator_states}
+            for future in concurrent.futures.as_completed(creator_futures):
+                try:
+                    future.result()
+                except SystemExit:
+                    creator_futures[future].failed = True # the creators module already reported, why it had to stop
+                except Exception:
+                    creator_futures[future].failed = True
+                    output(2,'\n [39]ERROR','<red>', f"Unexpected error during batch download of \'{creator_futures[future].creator_name}\': \n{traceback.format_exc()}")
 
 
 # BASE_DIR_NAME doesn't always have to be set; e.g. user tried scraping Messages of someone, that never direct messaged him content before
@@ -1755,6 +2203,32 @@ if BASE_DIR_NAME:
     # hacky overwrite for BASE_DIR_NAME so it doesn't point to the sub-directories e.g. /Timeline
     BASE_DIR_NAME = BASE_DIR_NAME.partition('_fansly')[0] + '_fansly'
 
+    # add up the counters of every module & creator
+    pic_count = sum(state.pic_count for state in download_states)
+    vid_count = sum(state.vid_count for state in download_states)
+    duplicate_count = sum(state.duplicate_count for state in download_states)
+
+    # batch mode; summarise every creator on its own & point to the download root, which holds all their folders
+    if len(creator_states) > 1:
+        print(f"\n╔═\n  Per creator summary:")
+        for state in creator_states:
+            print(f"  {state.creator_name}: {state.pic_count} pictures & {state.vid_count} videos, declined duplicates: {state.duplicate_count}{' (incomplete, see errors above)' if state.failed else ''}")
+        print(f"{74*' '}═╝")
+        BASE_DIR_NAME = download_root
+
+    if show_downloads:
+        output(1,'\n Info','<light-blue>', f"Download pipeline queue depths peaked at: {', '.join(f'{stage} {depth}' for stage, depth in download_pipeline.peak_depths().items())}")
+
+    # only worth mentioning, if fansly actually rate-limited some of the requests
+    request_stats = rate_limiter.stats()
+    if any(stats['throttled'] for stats in request_stats.values()):
+        throttled = ', '.join(f"{stats['throttled']} of {stats['requests']} {name}" for name, stats in request_stats.items())
+        output(3,'\n WARNING','<yellow>', f"Fansly rate-limited {throttled} requests;\
+            \n{20*' '}lowering api_requests_per_minute or cdn_requests_per_minute within config.ini might speed up future downloads.")
+
+    if playlist_cache.hits + playlist_cache.misses:
+        output(1,'\n Info','<light-blue>', f"Re-used {playlist_cache.hits} of {playlist_cache.hits + playlist_cache.misses} m3u8 playlists from their variant probe ({playlist_cache.hit_rate():.0%} hit rate).")
+
     print(f"\n╔═\n  Finished {download_mode} type, download of {pic_count} pictures & {vid_count} videos! Declined duplicates: {duplicate_count}\
         \n  Saved content in directory: \'{BASE_DIR_NAME}\'\
         \n  ✶ Please leave a Star on the GitHub Repository, if you are satisfied! ✶\n{74*' '}═╝")
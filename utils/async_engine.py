@@ -0,0 +1,197 @@
+import asyncio, atexit, json, threading, requests, importlib.util
+from requests.structures import CaseInsensitiveDict
+from utils.rate_limiter import RateLimiter, parse_retry_after
+from utils.lazy_import import LazyModule
+
+# aiohttp is optional; without it, the network_engine option falls back to the threaded requests session
+# it's only imported once an AsyncEngine gets used, as the import alone takes a noticeable part of the startup
+aiohttp = LazyModule('aiohttp') if importlib.util.find_spec('aiohttp') else None
+
+
+class AsyncEngine:
+    """
+    What is this?
+    Runs HTTP requests as coroutines on a single asyncio event loop, within its own background thread.
+    All requests share one aiohttp connection pool, whose size is the one concurrency budget of the whole process.
+    Requests are paced by the same RateLimiter as the threaded session, only waiting for a token doesn't block the loop.
+
+    Media & segment downloads are submitted as coroutines with .submit(), which returns right away; so thousands of them can be in flight
+    without a thread each. Synchronous code that needs a response right away (e.g. API pagination) uses .run() or EngineSession instead,
+    which blocks its calling thread. CPU work like hashing, remuxing or writing metadata stays within worker threads.
+
+    The event loops thread is only started by the first request; so a process can still fork (e.g. LibraryScanner) before that.
+
+    Usage:
+    engine = AsyncEngine(rate_limiter, concurrency = 64)
+    response = engine.run(engine.request('GET', url, headers = headers))
+    future = engine.submit(engine.fetch(url, retries = 5)) # concurrent.futures.Future of the response body
+    """
+    def __init__(self, rate_limiter: RateLimiter, concurrency: int = 64, max_retries: int = 5):
+        if aiohttp is None:
+            raise ImportError('AsyncEngine requires aiohttp')
+        self.rate_limiter = rate_limiter
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.session = None
+        self.loop = asyncio.new_event_loop()
+        self.thread = None
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def submit(self, coroutine):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target = self.loop.run_forever, name = 'async-engine', daemon = True)
+                self.thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    # must never be called from within the event loop itself
+    def run(self, coroutine):
+        return self.submit(coroutine).result()
+
+    async def _session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector = aiohttp.TCPConnector(limit = self.concurrency), cookie_jar = aiohttp.DummyCookieJar())
+        return self.session
+
+    # requests style timeout (total seconds or a (connect, read) tuple) to aiohttp.ClientTimeout
+    @staticmethod
+    def _timeout(timeout):
+        if timeout is None:
+            return aiohttp.ClientTimeout(total = None)
+        if isinstance(timeout, tuple):
+            return aiohttp.ClientTimeout(total = None, sock_connect = timeout[0], sock_read = timeout[1])
+        return aiohttp.ClientTimeout(total = None, sock_connect = timeout, sock_read = timeout)
+
+    async def request(self, method: str, url: str, params: dict = None, headers: dict = None, cookies: dict = None, stream: bool = False, timeout = None):
+        session = await self._session()
+        bucket = self.rate_limiter.bucket_for(url)
+        params = {key: str(value) for key, value in params.items()} if params else None
+        for attempt in range(self.max_retries + 1):
+            wait = bucket.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await session.request(method, url, params = params, headers = headers, cookies = cookies, timeout = self._timeout(timeout))
+                if response.status == 429 and attempt < self.max_retries:
+                    # back off exponentially, if fansly didn't tell us how long to wait
+                    bucket.penalize(parse_retry_after(response.headers.get('Retry-After'), default = 2 ** attempt * 5))
+                    response.release()
+                    continue
+                if response.status != 429:
+                    bucket.reward()
+                body = None if stream else await response.read()
+                return EngineResponse(self, response, body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise requests.exceptions.ConnectionError(f"{method} {url} failed: {e!r}") from e
+
+    # the whole body of a GET request; retried with exponential back off, also if a dropped connection ended the body early
+    async def fetch(self, url: str, headers: dict = None, cookies: dict = None, timeout = None, retries: int = 0):
+        for attempt in range(retries + 1):
+            try:
+                response = await self.request('GET', url, headers = headers, cookies = cookies, timeout = timeout)
+                response.raise_for_status()
+                expected_length = response.headers.get('content-length')
+                if expected_length and int(expected_length) != len(response.content):
+                    raise requests.exceptions.ContentDecodingError(f"Received {len(response.content)} of {expected_length} bytes for {url}")
+                return response.content
+            except requests.exceptions.RequestException:
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(2 ** attempt) # back off before retrying
+
+    async def _read(self, response, size: int = -1):
+        try:
+            return await response.content.read(size)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise requests.exceptions.ConnectionError(f"Reading {response.url} failed: {e!r}") from e
+
+    async def _close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def close(self):
+        if self.thread is not None and self.loop.is_running():
+            try:
+                self.run(self._close())
+            finally:
+                self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class EngineResponse:
+    """
+    The subset of requests.Response the downloader uses; streamed bodies are read chunk by chunk through the engines event loop.
+    """
+    def __init__(self, engine: AsyncEngine, response, body: bytes = None):
+        self.engine = engine
+        self.raw = response
+        self.status_code = response.status
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.url = str(response.url)
+        self.reason = response.reason
+        self._content = body
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = self.engine.run(self.engine._read(self.raw))
+            self.close()
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode(self.raw.charset or 'utf-8', errors = 'replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size: int = 1):
+        if self._content is not None:
+            for index in range(0, len(self._content), chunk_size):
+                yield self._content[index:index + chunk_size]
+            return
+        try:
+            while (chunk := self.engine.run(self.engine._read(self.raw, chunk_size))):
+                yield chunk
+        finally:
+            self.close()
+
+    # coroutine counterparts of .content & .iter_content(), for code that runs on the engines event loop itself
+    async def read(self):
+        if self._content is None:
+            try:
+                self._content = await self.engine._read(self.raw)
+            finally:
+                self.close()
+        return self._content
+
+    async def iter_chunks(self, chunk_size: int):
+        while (chunk := await self.engine._read(self.raw, chunk_size)):
+            yield chunk
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} {self.reason} for url: {self.url}", response = self)
+
+    def close(self):
+        self.engine.loop.call_soon_threadsafe(self.raw.release)
+
+
+class EngineSession:
+    """
+    Stand-in for the downloaders requests.Session, that sends every request through an AsyncEngine; each call blocks until its response arrived.
+    """
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.rate_limiter = engine.rate_limiter
+
+    def request(self, method: str, url: str, **kwargs):
+        return self.engine.run(self.engine.request(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
@@ -0,0 +1,53 @@
+import json, threading
+from os.path import join
+from utils.file_util import write_atomically
+
+
+class PaginationCheckpoint:
+    """
+    What is this?
+    Remembers how far the cursor paginated modules (Timeline, Messages) got for every creator, in a json file within the download root directory.
+    Before a page is downloaded, its cursor & the media ids on it are saved as pending; once the page completed, the cursor of the next page is saved instead,
+    with pending being None, as none of that pages media was even looked at yet.
+    So after a crash or Ctrl+C, a resumed run can continue at the page that was interrupted and only download its unfinished media.
+    Finished modules remove their checkpoint again, so the next run starts at the newest content as usual.
+
+    Every save replaces the file atomically; an interruption while writing never corrupts the previous checkpoint.
+
+    Usage:
+    checkpoint = PaginationCheckpoint(download_root)
+    checkpoint.get(creator_id, 'timeline') # returns {'cursor': ..., 'pending': [media ids] or None} or None
+    checkpoint.save(creator_id, 'timeline', cursor, pending_media_ids) # pending_media_ids = None; for a page that wasn't started yet
+    checkpoint.clear(creator_id, 'timeline')
+    """
+    FILENAME = 'fansly_checkpoints.json'
+
+    def __init__(self, root_dir: str):
+        self.path = join(root_dir, self.FILENAME)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.checkpoints = json.load(f)
+        except (OSError, ValueError):
+            self.checkpoints = {}
+
+    def _write(self):
+        write_atomically(self.path, json.dumps(self.checkpoints))
+
+    def get(self, creator_id, module: str):
+        with self.lock:
+            return self.checkpoints.get(str(creator_id), {}).get(module)
+
+    def save(self, creator_id, module: str, cursor, pending: list = None):
+        with self.lock:
+            self.checkpoints.setdefault(str(creator_id), {})[module] = {'cursor': cursor, 'pending': None if pending is None else list(pending)}
+            self._write()
+
+    def clear(self, creator_id, module: str):
+        with self.lock:
+            creator_checkpoints = self.checkpoints.get(str(creator_id), {})
+            if creator_checkpoints.pop(module, None) is None:
+                return
+            if not creator_checkpoints:
+                del self.checkpoints[str(creator_id)]
+            self._write()
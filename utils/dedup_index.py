@@ -0,0 +1,105 @@
+import os, atexit, sqlite3, threading, time
+from os.path import join
+
+
+class DedupIndex:
+    """
+    What is this?
+    A persistent deduplication index, stored as SQLite database in the download root directory.
+    It remembers the media_id, hash, fingerprint, content format (image, video, audio) and path of every downloaded or scanned file,
+    so that the deduplication variables can be re-filled with a single query at startup, instead of re-scanning the whole download folder.
+
+    Paths are stored relative to the download root, with forward slashes; so the same index can serve every creator folder within it.
+    Folders that were completely scanned once are marked as such; only the rows of those (or of folders within them) can be trusted to be complete.
+    Writes are buffered and committed in batches; call .commit() whenever written rows have to be persistent. Whatever is still buffered at exit gets committed by .close().
+
+    Usage:
+    dedup_index = DedupIndex(download_root)
+    dedup_index.add(filepath, media_id, file_hash, 'image')
+    dedup_index.set_hash(filepath, file_hash) # e.g. once the full md5 of a fingerprinted video was computed
+    dedup_index.mark_scanned(folder_path) # after a scan of folder_path completed
+    dedup_index.commit()
+    if dedup_index.is_scanned(folder_path):
+            for filepath, media_id, file_hash, content_format, fingerprint in dedup_index.load(folder_path):
+            ...
+    """
+    FILENAME = 'fansly_dedup_index.db'
+    COMMIT_INTERVAL_ROWS = 200
+    COMMIT_INTERVAL_SECONDS = 5
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self.db_path = join(root_dir, self.FILENAME)
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread = False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS media (path TEXT PRIMARY KEY, media_id INTEGER, hash TEXT, kind TEXT NOT NULL, fingerprint TEXT)')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS scanned_folders (path TEXT PRIMARY KEY)')
+        # indexes created by older versions lack the fingerprint column
+        if 'fingerprint' not in [column[1] for column in self.conn.execute('PRAGMA table_info(media)')]:
+            self.conn.execute('ALTER TABLE media ADD COLUMN fingerprint TEXT')
+        self.conn.commit()
+        atexit.register(self.close)
+
+    # convert an absolute filepath into the index' root-relative key
+    def relative_path(self, filepath: str):
+        return os.path.relpath(filepath, self.root_dir).replace(os.sep, '/')
+
+    def add(self, filepath: str, media_id, file_hash, content_format: str, fingerprint: str = None):
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO media (path, media_id, hash, kind, fingerprint) VALUES (?, ?, ?, ?, ?)',
+                              (self.relative_path(filepath), int(media_id) if media_id else None, str(file_hash) if file_hash else None, content_format, fingerprint))
+            self._written()
+
+    def set_hash(self, filepath: str, file_hash):
+        with self.lock:
+            self.conn.execute('UPDATE media SET hash = ? WHERE path = ?', (str(file_hash), self.relative_path(filepath)))
+            self._written()
+
+    def _written(self):
+        self.pending += 1
+        if self.pending >= self.COMMIT_INTERVAL_ROWS or time.monotonic() - self.last_commit >= self.COMMIT_INTERVAL_SECONDS:
+            self._commit()
+
+    def _commit(self):
+        self.conn.commit()
+        self.pending = 0
+        self.last_commit = time.monotonic()
+
+    def commit(self):
+        with self.lock:
+            self._commit()
+
+    def mark_scanned(self, folder_path: str):
+        with self.lock:
+            self.conn.execute('INSERT OR IGNORE INTO scanned_folders (path) VALUES (?)', (self.relative_path(folder_path),))
+            self._commit()
+
+    # whether folder_path, or a folder it's located in, was completely scanned before
+    def is_scanned(self, folder_path: str):
+        parts = self.relative_path(folder_path).split('/')
+        candidates = ['.'] + ['/'.join(parts[:index + 1]) for index in range(len(parts))]
+        with self.lock:
+            return self.conn.execute(f"SELECT 1 FROM scanned_folders WHERE path IN ({', '.join('?' * len(candidates))})", candidates).fetchone() is not None
+
+    # the LIKE pattern matching every path within folder_path
+    def _folder_pattern(self, folder_path: str):
+        prefix = self.relative_path(folder_path)
+        if prefix == '.':
+            return '%'
+        prefix = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return f"{prefix}/%"
+
+    # returns (absolute filepath, media_id, hash, content_format, fingerprint) of every indexed file within folder_path
+    def load(self, folder_path: str):
+        with self.lock:
+            rows = self.conn.execute("SELECT path, media_id, hash, kind, fingerprint FROM media WHERE path LIKE ? ESCAPE '\\'", (self._folder_pattern(folder_path),)).fetchall()
+        return [(join(self.root_dir, *path.split('/')), media_id, file_hash, content_format, fingerprint) for path, media_id, file_hash, content_format, fingerprint in rows]
+
+    def close(self):
+        with self.lock:
+            self._commit()
+            self.conn.close()
@@ -0,0 +1,14 @@
+import os
+
+
+# writes text into path atomically; it's written into a temporary file next to path first, which then replaces path
+# so an interruption while writing never leaves a truncated file behind. returns whether writing succeeded
+def write_atomically(path: str, text: str):
+    temp_path = f"{path}.tmp"
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+        return True
+    except OSError:
+        return False
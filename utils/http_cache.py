@@ -0,0 +1,54 @@
+import json, time, threading, requests
+from os.path import join
+from utils.file_util import write_atomically
+
+
+class HttpCache:
+    """
+    What is this?
+    A small on-disk cache of json responses from web APIs that are queried on every start, but rarely change (e.g. GitHub releases, the user-agent list).
+    A cached response is re-used for ttl seconds; failed requests are remembered as well, so an unreachable API doesn't delay every start either.
+    If a request fails, the last successful response is returned instead, however old it is.
+
+    With offline = True no request is sent at all, only what's cached is returned; e.g. for unattended runs.
+
+    Usage:
+    http_cache = HttpCache(directory)
+    data = http_cache.get_json(url, headers = headers, ttl = 6 * 3600) # returns the parsed json or None
+    data = http_cache.get_json(url, ttl = 6 * 3600, offline = True)
+    """
+    FILENAME = '.fansly_http_cache.json'
+    REQUEST_TIMEOUT = 10
+
+    def __init__(self, directory: str):
+        self.cache_path = join(directory, self.FILENAME)
+        self.lock = threading.Lock()
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _write(self):
+        write_atomically(self.cache_path, json.dumps(self.entries))
+
+    def get_json(self, url: str, headers: dict = None, ttl: float = 3600, offline: bool = False):
+        with self.lock:
+            entry = self.entries.get(url) # {'time': of the last request, 'json': last successful response or None}
+        if entry and (offline or time.time() - entry['time'] < ttl):
+            return entry['json']
+        if offline:
+            return None
+
+        try:
+            response = requests.get(url, allow_redirects = True, headers = headers, timeout = self.REQUEST_TIMEOUT)
+            data = response.json() if response.ok else None
+        except (requests.exceptions.RequestException, ValueError):
+            data = None
+
+        if data is None and entry:
+            data = entry['json']
+        with self.lock:
+            self.entries[url] = {'time': time.time(), 'json': data}
+            self._write()
+        return data
@@ -0,0 +1,48 @@
+import importlib, threading, time
+
+
+# module name -> seconds its import took, for every LazyModule that was imported so far
+import_timings = {}
+_import_lock = threading.RLock()
+
+
+class LazyModule:
+    """
+    What is this?
+    A stand-in for a heavy dependency (e.g. av, imagehash, pyexiv2), that only imports the module on first attribute access.
+    So startup doesn't pay for modules a run might never use, e.g. the video remuxer on a run that only downloads images.
+    on_import(module) runs once right after the import, e.g. to configure the module; how long each import took is kept in import_timings.
+
+    Usage:
+    av = LazyModule('av')
+    av.open(filepath) # av gets imported here
+    Image = LazyModule('PIL.Image', on_import = configure_pil)
+    """
+    def __init__(self, name: str, on_import = None):
+        self.__dict__['_name'] = name
+        self.__dict__['_on_import'] = on_import
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _import_lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    import_timings[self._name] = time.perf_counter() - started
+                    if self._on_import:
+                        self._on_import(module)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __setattr__(self, attribute: str, value):
+        setattr(self._load(), attribute, value)
+
+    def __repr__(self):
+        state = 'imported' if self.__dict__['_module'] is not None else 'not imported yet'
+        return f"<LazyModule '{self._name}' ({state})>"
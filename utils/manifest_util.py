@@ -0,0 +1,125 @@
+import os, json, threading
+from os.path import join
+from utils.file_util import write_atomically
+
+
+class FolderManifest:
+    """
+    What is this?
+    An append-only record of the media_id & hash of every file within a download folder, stored as hidden JSON Lines file within the folder itself.
+    Each line holds filename, media_id, hash, size and mtime (ns) of one file; later lines replace earlier ones of the same filename.
+    Looking up a file only needs a stat call, instead of opening and parsing its Exif metadata or MP4 atoms.
+    Entries whose size or mtime no longer match the file (e.g. it was modified or replaced since) are ignored.
+
+    Recording a file appends a single line, so downloads never rewrite the whole manifest;
+    once most lines are outdated, the manifest is compacted into one line per existing file.
+
+    Usage:
+    manifest = manifest_for(directory) # shared per directory & process
+    manifest.lookup(filename) # returns dict with 'media_id' & 'hash' or None
+    manifest.append(filename, media_id, file_hash)
+    """
+    FILENAME = '.fansly_manifest.jsonl'
+    COMPACT_MIN_LINES = 200
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.manifest_path = join(directory, self.FILENAME)
+        self.entries = {}
+        self.lines = 0
+        self.manifest_stat = None
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        self.entries, self.lines = {}, 0
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry['filename']] = entry
+                        self.lines += 1
+                    except (ValueError, KeyError, TypeError):
+                        continue # e.g. a line cut off by a crash while appending
+            self.manifest_stat = self._stat()
+        except OSError:
+            self.manifest_stat = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.manifest_path)
+            return stat.st_size, stat.st_mtime_ns
+        except OSError:
+            return None
+
+    # re-load the manifest, if another process changed it meanwhile
+    def refresh(self):
+        with self.lock:
+            if self._stat() != self.manifest_stat:
+                self._load()
+
+    def lookup(self, filename: str):
+        try:
+            stat = os.stat(join(self.directory, filename))
+        except OSError:
+            return None
+        with self.lock:
+            entry = self.entries.get(filename)
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                return entry
+        return None
+
+    # record a file with its current size & mtime; call it after everything was written into the file
+    def append(self, filename: str, media_id, file_hash):
+        try:
+            stat = os.stat(join(self.directory, filename))
+        except OSError:
+            return
+        entry = {'filename': filename, 'media_id': int(media_id) if media_id else None, 'hash': str(file_hash) if file_hash else None, 'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        with self.lock:
+            if self.entries.get(filename) == entry:
+                return
+            try:
+                with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + '\n')
+            except OSError:
+                return
+            self.entries[filename] = entry
+            self.lines += 1
+            if self.lines >= self.COMPACT_MIN_LINES and self.lines > 2 * len(self.entries):
+                self._compact()
+            self.manifest_stat = self._stat()
+
+    # fold the manifest into one line per file that still exists; replaces the file atomically
+    def _compact(self):
+        self.entries = {filename: entry for filename, entry in self.entries.items() if os.path.exists(join(self.directory, filename))}
+        if write_atomically(self.manifest_path, ''.join(json.dumps(entry) + '\n' for entry in self.entries.values())):
+            self.lines = len(self.entries)
+
+    def compact(self):
+        with self.lock:
+            self._compact()
+            self.manifest_stat = self._stat()
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+# the FolderManifest of a directory; loaded once per process & re-loaded whenever another process changed it
+def manifest_for(directory: str):
+    directory = os.path.abspath(directory)
+    with _manifests_lock:
+        manifest = _manifests.get(directory)
+        if manifest is None:
+            manifest = _manifests[directory] = FolderManifest(directory)
+            return manifest
+    manifest.refresh()
+    return manifest
+
+# the manifest entry of a file, if its folder has a manifest & the file is unchanged since it was recorded
+def lookup_manifest(filepath: str):
+    directory, filename = os.path.split(os.path.abspath(filepath))
+    if not os.path.exists(join(directory, FolderManifest.FILENAME)):
+        return None
+    return manifest_for(directory).lookup(filename)
@@ -1,6 +1,12 @@
-import pyexiv2
-from mutagen.mp4 import MP4
-from mutagen.id3 import ID3, TXXX
+import os
+from functools import lru_cache
+from utils.manifest_util import lookup_manifest
+from utils.lazy_import import LazyModule
+
+# only imported once metadata of their file formats is actually read or written
+pyexiv2 = LazyModule('pyexiv2')
+mutagen_mp4 = LazyModule('mutagen.mp4')
+mutagen_id3 = LazyModule('mutagen.id3')
 
 
 class InvalidKeyError(Exception):
@@ -32,18 +38,25 @@ class MetadataManager:
     metadata_manager.set_custom_metadata("HSH", '10ej3e691af63ae66843218c42d5d0b3')
     metadata_manager.add_metadata()
     metadata_manager.save()
+
+    Add metadata to a temporary file, whose extension doesn't tell its file format (e.g. '.part'):
+    metadata_manager.set_filepath(temp_filepath, filetype = 'mp4')
     
     Read metadata:
     metadata_manager = MetadataManager()
     metadata_manager.read_metadata(filepath)
     print(metadata_manager.formatted_metadata())
     print(metadata_manager.raw_metadata)
+
+    Read the ID & HSH of a file, parsing it at most once for as long as it's unchanged (or not at all, if its folder manifest recorded it):
+    print(read_cached_metadata(filepath)) # e.g. {'ID': 305462832970526416, 'HSH': '10ej3e691af63ae66843218c42d5d0b3'}
     """ 
-    def __init__(self, filepath=None):
+    def __init__(self, filepath=None, filetype=None):
         self.filepath = filepath
         self.custom_metadata = {}
-        self.filetype = None if filepath is None else filepath.split('.')[-1].lower()
+        self.filetype = filetype.lower() if filetype else None if filepath is None else filepath.split('.')[-1].lower()
         self.raw_metadata = {}
+        self.metadata_read = False
         self.image_filetypes = [
             'jpeg', 'jpg', 'png',
             'exv', 'cr2', 'crw', 'tiff', 'webp', 'dng', 'nef', 'pef',
@@ -54,9 +67,11 @@ class MetadataManager:
         filetype = self.filetype if filetype is None else filetype
         return filetype in ['mp4', 'mp3'] or filetype in self.image_filetypes
 
-    def set_filepath(self, filepath):
+    # filetype overrides the file format, which is otherwise told by the file extension
+    def set_filepath(self, filepath, filetype=None):
         self.filepath = filepath
-        self.filetype = filepath.split('.')[-1].lower()
+        self.filetype = filetype.lower() if filetype else filepath.split('.')[-1].lower()
+        self.metadata_read = False
 
     # initial temporary storage in-case multiple keys shall be added, in one run
     def set_custom_metadata(self, custom_key: str, custom_value: str):
@@ -66,9 +81,10 @@ class MetadataManager:
             raise InvalidKeyError(f"Received custom_key \'{custom_key}\', but MetadataManager only supports custom keys named \'HSH\' or \'ID\'")
         self.custom_metadata[custom_key] = custom_value
 
-    # return formatted metadata
+    # return formatted metadata; the file is only parsed, if read_metadata() didn't already
     def formatted_metadata(self):
-        self.read_metadata()
+        if not self.metadata_read:
+            self.read_metadata()
         result = {}
         if self.filetype == 'mp3':
             if 'TXXX:HSH' in self.raw_metadata:
@@ -95,18 +111,18 @@ class MetadataManager:
     # read metadata
     def read_metadata(self, filepath=None):
         if not self.filepath and filepath:
-            self.filepath = filepath
-            self.filetype = filepath.rsplit('.')[1]
+            self.set_filepath(filepath)
         if self.filetype in ['mp4', 'mp3']:
             self.read_audio_video_metadata()
         elif self.filetype in self.image_filetypes:
             self.read_image_metadata()
+        self.metadata_read = True
 
     def read_audio_video_metadata(self):
         if self.filetype == 'mp3':
-            self.raw_metadata = ID3(self.filepath)
+            self.raw_metadata = mutagen_id3.ID3(self.filepath)
         elif self.filetype == 'mp4':
-            self.raw_metadata = MP4(self.filepath)
+            self.raw_metadata = mutagen_mp4.MP4(self.filepath)
 
     def read_image_metadata(self):
         with pyexiv2.Image(self.filepath) as image:
@@ -123,11 +139,11 @@ class MetadataManager:
                 self.add_image_metadata(key, value)
     
     def add_mp3_metadata(self, key, value):
-        txxx_frame = TXXX(encoding=3, desc=key, text=value)
+        txxx_frame = mutagen_id3.TXXX(encoding=3, desc=key, text=value)
         self.raw_metadata.add(txxx_frame)
     
     def add_mp4_metadata(self, key, value):
-        if not isinstance(self.raw_metadata, MP4):
+        if not isinstance(self.raw_metadata, mutagen_mp4.MP4):
             self.read_audio_video_metadata()
         if len(key) < 4:
             key = key + '_' * (4 - len(key))
@@ -150,3 +166,19 @@ class MetadataManager:
                 image.modify_exif(self.raw_metadata)
         else:
             self.raw_metadata.save(self.filepath)
+
+
+@lru_cache(maxsize=256)
+def _read_formatted_metadata(filepath: str, filetype: str, mtime_ns: int, size: int):
+    metadata_manager = MetadataManager(filepath, filetype)
+    metadata_manager.read_metadata()
+    return metadata_manager.formatted_metadata()
+
+# formatted metadata (ID & HSH) of a file; cached by path & mtime, so repeated lookups of an unchanged file never parse it again
+# files recorded in the manifest of their folder aren't parsed at all. filetype overrides the file format, which is otherwise told by the file extension
+def read_cached_metadata(filepath: str, filetype: str = None):
+    entry = lookup_manifest(filepath)
+    if entry:
+        return {key: entry[field] for key, field in [('ID', 'media_id'), ('HSH', 'hash')] if entry[field]}
+    stat = os.stat(filepath)
+    return dict(_read_formatted_metadata(filepath, filetype, stat.st_mtime_ns, stat.st_size))
@@ -0,0 +1,120 @@
+import os, queue, atexit, threading, concurrent.futures
+from utils.metadata_manager import MetadataManager, read_cached_metadata
+
+
+# sentinel, that tells the service thread to exit
+_SHUTDOWN = object()
+
+
+class MetadataService:
+    """
+    What is this?
+    pyexiv2 (and so MetadataManager) isn't thread-safe; this service is the single owner of every metadata read and write.
+    Requests from any amount of threads are queued and performed one after another by the services own thread, their results are handed back through futures.
+    Whatever piled up in the queue meanwhile is handled as one batch; several writes to the same file within a batch are merged into a single save.
+
+    A forked child process (e.g. a LibraryScanner worker) doesn't inherit the service thread; it's the only user of pyexiv2 within its process anyway,
+    so there requests are simply performed inline.
+
+    Usage:
+    metadata_service = MetadataService()
+    future = metadata_service.read(filepath) # concurrent.futures.Future; resolves to e.g. {'ID': 305462832970526416, 'HSH': '10ej3e691af63ae66843218c42d5d0b3'}
+    metadata_service.write(filepath, {'ID': media_id, 'HSH': file_hash}, filetype = 'mp4').result()
+    metadata_service.close()
+    """
+    def __init__(self, max_batch: int = 32):
+        self.max_batch = max(1, max_batch)
+        self.owner_pid = os.getpid()
+        self.requests = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def read(self, filepath: str, filetype: str = None):
+        return self._submit('read', filepath, filetype, None)
+
+    # custom_metadata is a dict of MetadataManager custom keys (ID, HSH) and their values
+    def write(self, filepath: str, custom_metadata: dict, filetype: str = None):
+        return self._submit('write', filepath, filetype, dict(custom_metadata))
+
+    def _submit(self, kind: str, filepath: str, filetype: str, custom_metadata: dict):
+        future = concurrent.futures.Future()
+        if os.getpid() != self.owner_pid:
+            # forked child; perform the request right away
+            if kind == 'read':
+                self._resolve([future], self._read, filepath, filetype)
+            else:
+                self._resolve([future], self._write, filepath, filetype, custom_metadata)
+            return future
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target = self._serve, name = 'metadata-service', daemon = True)
+                self.thread.start()
+        self.requests.put((kind, filepath, filetype, custom_metadata, future))
+        return future
+
+    @staticmethod
+    def _read(filepath: str, filetype: str):
+        return read_cached_metadata(filepath, filetype)
+
+    @staticmethod
+    def _write(filepath: str, filetype: str, custom_metadata: dict):
+        metadata_manager = MetadataManager()
+        metadata_manager.set_filepath(filepath, filetype = filetype)
+        for key, value in custom_metadata.items():
+            metadata_manager.set_custom_metadata(key, value)
+        metadata_manager.add_metadata()
+        metadata_manager.save()
+
+    @staticmethod
+    def _resolve(futures: list, func, *args):
+        futures = [future for future in futures if future.set_running_or_notify_cancel()]
+        try:
+            result = func(*args)
+        except BaseException as e:
+            for future in futures:
+                future.set_exception(e)
+        else:
+            for future in futures:
+                future.set_result(result)
+
+    def _serve(self):
+        while True:
+            batch = [self.requests.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.requests.get_nowait())
+                except queue.Empty:
+                    break
+
+            # writes are merged per file; a read of a file with a merged write in front of it flushes that write first
+            writes = {} # (filepath, filetype) -> (merged custom metadata, [futures])
+            for request in batch:
+                if request is _SHUTDOWN:
+                    continue
+                kind, filepath, filetype, custom_metadata, future = request
+                if kind == 'write':
+                    merged_metadata, futures = writes.setdefault((filepath, filetype), ({}, []))
+                    merged_metadata.update(custom_metadata)
+                    futures.append(future)
+                else:
+                    if (filepath, filetype) in writes:
+                        merged_metadata, futures = writes.pop((filepath, filetype))
+                        self._resolve(futures, self._write, filepath, filetype, merged_metadata)
+                    self._resolve([future], self._read, filepath, filetype)
+            for (filepath, filetype), (merged_metadata, futures) in writes.items():
+                self._resolve(futures, self._write, filepath, filetype, merged_metadata)
+
+            if _SHUTDOWN in batch:
+                return
+
+    def close(self):
+        with self.lock:
+            thread, self.thread = self.thread, None
+        if thread is not None and os.getpid() == self.owner_pid:
+            self.requests.put(_SHUTDOWN)
+            thread.join()
+
+
+# the one metadata service of the process; every module shares it, so pyexiv2 is only ever used by a single thread
+metadata_service = MetadataService()
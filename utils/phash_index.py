@@ -0,0 +1,73 @@
+import threading
+
+
+class PhashIndex:
+    """
+    What is this?
+    A set-like index of image pHashes (hex strings), in which a hash is "contained" if any indexed hash is within max_distance bits (Hamming distance) of it.
+    So re-compressed or slightly resized re-uploads of an image are recognized as duplicates, instead of only byte-identical pHashes.
+
+    It uses multi-index hashing: every hash is split into max_distance + 1 disjoint bit ranges & indexed by each of them.
+    Two hashes within max_distance bits of each other must be identical in at least one of those ranges (pigeonhole principle),
+    so a lookup only compares against the few hashes sharing a range with it, instead of the whole library.
+    Hashes of different lengths (e.g. from older hash_size settings) are indexed separately & never match each other.
+
+    Usage:
+    photo_hashes = PhashIndex(max_distance = 8)
+    photo_hashes.add(file_hash)
+    if file_hash in photo_hashes:
+        ...
+    photo_hashes.find(file_hash) # returns the closest matching indexed hash or None
+    """
+    def __init__(self, max_distance: int = 0):
+        self.max_distance = max(0, max_distance)
+        self.hashes = set()
+        self.tables = {} # hash bit length -> list of (shift, mask, {bit range value: [hash ints]}), one per bit range
+        self.lock = threading.Lock()
+
+    # bit ranges a hash of bit_length bits is split into; as evenly as possible
+    def _ranges(self, bit_length: int):
+        parts = min(self.max_distance + 1, bit_length)
+        bounds = [bit_length * index // parts for index in range(parts + 1)]
+        return [(bounds[index], (1 << (bounds[index + 1] - bounds[index])) - 1) for index in range(parts)]
+
+    @staticmethod
+    def _parse(file_hash):
+        file_hash = str(file_hash)
+        try:
+            return int(file_hash, 16), len(file_hash) * 4
+        except ValueError:
+            return None, None
+
+    def add(self, file_hash):
+        value, bit_length = self._parse(file_hash)
+        with self.lock:
+            self.hashes.add(str(file_hash))
+            if value is None or not self.max_distance:
+                return
+            if bit_length not in self.tables:
+                self.tables[bit_length] = [(shift, mask, {}) for shift, mask in self._ranges(bit_length)]
+            for shift, mask, table in self.tables[bit_length]:
+                table.setdefault((value >> shift) & mask, []).append(value)
+
+    def find(self, file_hash):
+        file_hash = str(file_hash)
+        with self.lock:
+            if file_hash in self.hashes:
+                return file_hash
+            value, bit_length = self._parse(file_hash)
+            if value is None or not self.max_distance or bit_length not in self.tables:
+                return None
+            best, best_distance = None, self.max_distance + 1
+            for shift, mask, table in self.tables[bit_length]:
+                for candidate in table.get((value >> shift) & mask, ()):
+                    distance = bin(value ^ candidate).count('1')
+                    if distance < best_distance:
+                        best, best_distance = candidate, distance
+            return None if best is None else format(best, f"0{bit_length // 4}x")
+
+    def __contains__(self, file_hash):
+        return self.find(file_hash) is not None
+
+    def __len__(self):
+        return len(self.hashes)
@@ -0,0 +1,159 @@
+import queue, threading, concurrent.futures
+
+
+# sentinel, that tells a stage worker to exit
+_SHUTDOWN = object()
+
+
+class PipelineStage:
+    def __init__(self, name: str, func, workers: int, queue_depth: int, max_pending: int):
+        self.name = name
+        self.func = func # callable; takes an item, returns the item for the next stage, None to drop it or a Future of either
+        self.workers = max(1, workers)
+        self.queue = queue.Queue(maxsize = max(1, queue_depth))
+        self.peak_depth = 0
+        self.pending = threading.BoundedSemaphore(max(1, max_pending)) # bounds the futures of this stage, that are still running
+        self.completed = queue.Queue() # (group, future) of finished futures, for the stages forwarder thread
+
+
+class StagePipeline:
+    """
+    What is this?
+    A long-lived chain of processing stages, each served by its own pool of worker threads and fed by its own bounded queue.
+    Items are handed from stage to stage in the given order; a full queue blocks the stage in front of it,
+    so a slow stage throttles the ones before it instead of letting work pile up in memory.
+
+    A stage may also return a concurrent.futures.Future, e.g. of a coroutine running on an event loop; its worker moves on right away,
+    while the stages forwarder thread hands the result on once the future finished. At most max_pending futures per stage run at once.
+
+    Items can be submitted in groups, e.g. one per batch of media. The first exception raised by any stage is remembered for the group of its item;
+    the groups items still within the pipeline are dropped from then on and the exception is re-raised by .join() of that group.
+    on_drop(item) is called for each of those dropped items, e.g. to remove the temporary files they already brought along.
+    Other groups keep flowing through the pipeline untouched.
+
+    Usage:
+    pipeline = StagePipeline([('fetch', fetch, 4), ('hash', hash, 2)], queue_depth = 8, max_pending = 64, on_drop = discard)
+    for item in items:
+        if not pipeline.submit(item, group = batch):
+            break
+    pipeline.join(group = batch) # waits for every item of the group, re-raises its first stage exception
+    print(pipeline.queue_depths(), pipeline.peak_depths())
+    pipeline.close()
+    """
+    def __init__(self, stages: list, queue_depth: int = 8, max_pending: int = 64, on_drop = None):
+        self.stages = [PipelineStage(name, func, workers, queue_depth, max_pending) for name, func, workers in stages]
+        self.on_drop = on_drop
+        self.condition = threading.Condition()
+        self.in_flight = {} # group -> amount of its items within the pipeline
+        self.errors = {} # group -> first exception raised for one of its items
+        self.threads = []
+        for index, stage in enumerate(self.stages):
+            for number in range(stage.workers):
+                thread = threading.Thread(target = self._work, args = (index,), name = f"{stage.name}-{number}", daemon = True)
+                thread.start()
+                self.threads.append(thread)
+            thread = threading.Thread(target = self._forward_completed, args = (index,), name = f"{stage.name}-forwarder", daemon = True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _put(self, index: int, item):
+        stage = self.stages[index]
+        stage.queue.put(item)
+        stage.peak_depth = max(stage.peak_depth, stage.queue.qsize())
+
+    def _done(self, group):
+        with self.condition:
+            self.in_flight[group] -= 1
+            if not self.in_flight[group]:
+                self.condition.notify_all()
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        while True:
+            entry = stage.queue.get()
+            if entry is _SHUTDOWN:
+                return
+            group, item = entry
+            stage.pending.acquire()
+            try:
+                if group in self.errors:
+                    item = self._drop(item)
+                else:
+                    item = stage.func(item)
+            except BaseException as e:
+                self._fail(group, e)
+                item = None
+            if isinstance(item, concurrent.futures.Future):
+                # the callback runs within whatever thread finished the future (e.g. an event loop); so it must not block
+                item.add_done_callback(lambda future, group = group: stage.completed.put((group, future)))
+                continue
+            stage.pending.release()
+            self._forward(index, group, item)
+
+    def _forward_completed(self, index: int):
+        stage = self.stages[index]
+        while True:
+            entry = stage.completed.get()
+            if entry is _SHUTDOWN:
+                return
+            group, future = entry
+            stage.pending.release()
+            try:
+                item = future.result()
+                if group in self.errors and item is not None:
+                    item = self._drop(item)
+            except BaseException as e:
+                self._fail(group, e)
+                item = None
+            self._forward(index, group, item)
+
+    # an item of a group that failed already; never raises, so the groups first exception is the one that's kept
+    def _drop(self, item):
+        if self.on_drop:
+            try:
+                self.on_drop(item)
+            except Exception:
+                pass
+        return None
+
+    def _fail(self, group, error: BaseException):
+        with self.condition:
+            self.errors.setdefault(group, error)
+
+    # hands an item on to the next stage; or marks it as done after the last stage, or once it was dropped
+    def _forward(self, index: int, group, item):
+        if item is not None and index + 1 < len(self.stages):
+            self._put(index + 1, (group, item))
+        else:
+            self._done(group)
+
+    # hands an item to the first stage; blocks while its queue is full. returns False, once a stage failed on an item of the same group
+    def submit(self, item, group = None):
+        with self.condition:
+            if group in self.errors:
+                return False
+            self.in_flight[group] = self.in_flight.get(group, 0) + 1
+        self._put(0, (group, item))
+        return True
+
+    def join(self, group = None):
+        with self.condition:
+            self.condition.wait_for(lambda: not self.in_flight.get(group))
+            self.in_flight.pop(group, None)
+            error = self.errors.pop(group, None)
+        if error is not None:
+            raise error
+
+    # amount of items currently waiting in front of each stage
+    def queue_depths(self):
+        return {stage.name: stage.queue.qsize() for stage in self.stages}
+
+    # highest amount of items, that were waiting in front of each stage at once
+    def peak_depths(self):
+        return {stage.name: stage.peak_depth for stage in self.stages}
+
+    def close(self):
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                stage.queue.put(_SHUTDOWN)
+            stage.completed.put(_SHUTDOWN)
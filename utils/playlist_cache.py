@@ -0,0 +1,82 @@
+import base64, json, threading, time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+
+
+class PlaylistCache:
+    """
+    What is this?
+    A small in-memory LRU cache for parsed m3u8 playlists, so that the playlist probed by parse_media_info()
+    doesn't have to be requested once more by download_m3u8().
+
+    Entries are keyed on the playlist url without its query string (which only carries the signature),
+    and expire together with the CloudFront signature they were fetched with; a playlist is never served past the point,
+    at which its segment urls would stop working. If no expiry can be parsed, entries live for default_ttl seconds.
+
+    Usage:
+    playlist_cache = PlaylistCache()
+    playlist_cache.put(url, playlist_obj, policy)
+    playlist_obj = playlist_cache.get(url) # None on miss
+    print(playlist_cache.hit_rate())
+    """
+    # stop serving playlists this many seconds before their signature expires
+    EXPIRY_MARGIN = 60
+
+    def __init__(self, max_entries: int = 1024, default_ttl: float = 300):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(url: str):
+        return url.split('?')[0]
+
+    # parse the expiry epoch out of a CloudFront policy (custom policy) or an Expires url parameter (canned policy)
+    @staticmethod
+    def signature_expiry(url: str, policy: str = None):
+        query = parse_qs(urlsplit(url).query)
+        policy = policy or next(iter(query.get('Policy', [])), None)
+        if policy:
+            try:
+                decoded = base64.b64decode(policy.replace('-', '+').replace('_', '=').replace('~', '/'))
+                statement = json.loads(decoded)['Statement'][0]
+                return float(statement['Condition']['DateLessThan']['AWS:EpochTime'])
+            except (ValueError, KeyError, IndexError, TypeError):
+                pass
+        expires = next(iter(query.get('Expires', [])), None)
+        try:
+            return float(expires) if expires else None
+        except ValueError:
+            return None
+
+    def get(self, url: str):
+        key = self.cache_key(url)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.time():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, url: str, playlist, policy: str = None):
+        expiry = self.signature_expiry(url, policy)
+        expires_at = expiry - self.EXPIRY_MARGIN if expiry else time.time() + self.default_ttl
+        if expires_at <= time.time():
+            return
+        with self.lock:
+            self.entries[self.cache_key(url)] = (expires_at, playlist)
+            self.entries.move_to_end(self.cache_key(url))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last = False)
+
+    def hit_rate(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return self.hits / lookups if lookups else 0.0
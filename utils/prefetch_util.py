@@ -0,0 +1,71 @@
+import queue, threading
+from utils.stream_util import put_until_stopped
+
+
+class CursorPrefetcher:
+    """
+    What is this?
+    Walks a cursor paginated API endpoint (e.g. a creators Timeline) in a background thread, so the next pages are already fetched
+    and parsed while the current one is still downloading. At most depth pages are kept ahead of the consumer.
+
+    fetch_page(cursor) has to return (page, next_cursor); next_cursor being None once the last page was reached.
+    If fetch_page raises, the exception is handed over to the consumer by .next_page() and the prefetcher stops;
+    the following .next_page() call starts over again at the cursor that failed.
+
+    Usage:
+    pages = CursorPrefetcher(fetch_page, first_cursor, depth = 2)
+    while (item := pages.next_page()):
+        cursor, page = item
+    pages.close()
+    """
+    def __init__(self, fetch_page, cursor, depth: int = 2):
+        self.fetch_page = fetch_page
+        self.depth = max(1, depth)
+        self.retry_cursor = cursor
+        self.page_queue = None
+        self.stop_event = threading.Event()
+        self.feeder = None
+
+    # blocking put, that gives up once the consumer closed the prefetcher
+    def _put(self, page_queue: queue.Queue, item):
+        return put_until_stopped(page_queue, item, self.stop_event)
+
+    def _feed(self, page_queue: queue.Queue, cursor):
+        while not self.stop_event.is_set():
+            try:
+                page, next_cursor = self.fetch_page(cursor)
+            except Exception as e:
+                self._put(page_queue, (cursor, None, e))
+                return
+            if not self._put(page_queue, (cursor, page, None)):
+                return
+            if next_cursor is None:
+                self._put(page_queue, None) # end of pages
+                return
+            cursor = next_cursor
+
+    def _start(self, cursor):
+        self.page_queue = queue.Queue(maxsize = self.depth)
+        self.feeder = threading.Thread(target = self._feed, args = (self.page_queue, cursor), daemon = True)
+        self.feeder.start()
+
+    # returns (cursor, page) of the next page or None after the last one; re-raises whatever fetch_page raised for it
+    def next_page(self):
+        if self.retry_cursor is not None:
+            cursor, self.retry_cursor = self.retry_cursor, None
+            self._start(cursor)
+        elif self.page_queue is None:
+            return None
+
+        item = self.page_queue.get()
+        if item is None:
+            self.page_queue = None
+            return None
+        cursor, page, error = item
+        if error:
+            self.retry_cursor = cursor
+            raise error
+        return cursor, page
+
+    def close(self):
+        self.stop_event.set()
@@ -0,0 +1,118 @@
+import threading, time, requests
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """
+    Paces requests of a single endpoint class, with a token bucket that refills at `rate` tokens per second up to `burst` tokens.
+    Every request takes one token; if none are left, the caller waits until the bucket has refilled enough.
+
+    The rate adapts: a HTTP 429 response halves it and blocks the bucket for the given Retry-After,
+    while every successful response slowly grows it back towards the configured rate.
+    """
+    def __init__(self, requests_per_minute: float, burst: int):
+        self.base_rate = requests_per_minute / 60
+        self.rate = self.base_rate
+        self.min_rate = self.base_rate / 16
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.request_count = 0
+        self.throttled_count = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    # take a token and return how many seconds the caller has to wait, before it may send its request
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.request_count += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    # multiplicative decrease on a rate-limit response
+    def penalize(self, retry_after: float):
+        with self.lock:
+            now = time.monotonic()
+            self.throttled_count += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    # additive increase on every response that wasn't rate-limited
+    def reward(self):
+        with self.lock:
+            self.rate = min(self.base_rate, self.rate + self.base_rate / 20)
+
+
+class RateLimiter:
+    """
+    Holds one TokenBucket per endpoint class; "api" for requests to the fansly api and "cdn" for everything else (media, playlists & segments).
+    """
+    API_HOSTS = ('apiv3.fansly.com',)
+
+    def __init__(self, api_requests_per_minute: float, cdn_requests_per_minute: float):
+        self.buckets = {
+            'api': TokenBucket(api_requests_per_minute, burst = 3),
+            'cdn': TokenBucket(cdn_requests_per_minute, burst = 40),
+        }
+
+    def classify(self, url: str):
+        return 'api' if urlparse(url).hostname in self.API_HOSTS else 'cdn'
+
+    def bucket_for(self, url: str):
+        return self.buckets[self.classify(url)]
+
+    # amount of requests that were actually sent & how many of them got rate-limited, per endpoint class
+    def stats(self):
+        return {name: {'requests': bucket.request_count, 'throttled': bucket.throttled_count} for name, bucket in self.buckets.items()}
+
+
+# parse a Retry-After header, which is either a delay in seconds or a HTTP date
+def parse_retry_after(value: str, default: float):
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimitedSession(requests.Session):
+    """
+    Drop-in requests.Session, that paces every request through a RateLimiter and transparently retries HTTP 429 responses.
+    """
+    def __init__(self, rate_limiter: RateLimiter, max_retries: int = 5):
+        super().__init__()
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+
+    def request(self, method, url, *args, **kwargs):
+        bucket = self.rate_limiter.bucket_for(url)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code != 429:
+                bucket.reward()
+                return response
+            if attempt == self.max_retries:
+                return response
+            # back off exponentially, if fansly didn't tell us how long to wait
+            bucket.penalize(parse_retry_after(response.headers.get('Retry-After'), default = 2 ** attempt * 5))
+            response.close()
@@ -0,0 +1,306 @@
+import os, re, sys, json, hashlib, threading, traceback, mimetypes, multiprocessing, concurrent.futures
+from os.path import join
+from utils.metadata_manager import MetadataManager
+from utils.metadata_service import metadata_service
+from utils.manifest_util import manifest_for
+from utils.lazy_import import LazyModule
+from utils.file_util import write_atomically
+
+def configure_pil(Image):
+    # tell PIL to be tolerant of files that are truncated
+    import PIL.ImageFile
+    PIL.ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+    # turn off for our purpose unnecessary PIL safety features
+    Image.MAX_IMAGE_PIXELS = None
+
+# only imported once the first image gets hashed; the downloader imports these as well, so PIL is set up in one place only
+Image = LazyModule('PIL.Image', on_import = configure_pil)
+imagehash = LazyModule('imagehash')
+
+
+class StatCache:
+    """
+    What is this?
+    A small per-directory cache of previously scanned files, stored as hidden json file within the directory itself.
+    Each file is keyed on its name and remembered together with its size, mtime_ns and inode, as well as the media_id, hash, fingerprint & content format that were extracted from it.
+    As long as those stat values are unchanged on the next scan, the file can be reused without reading its metadata or hashing it again.
+
+    Entries of files that weren't looked up during a scan (e.g. deleted or renamed files) are dropped, on .save().
+
+    Usage:
+    stat_cache = StatCache(directory)
+    entry = stat_cache.lookup(filename) # returns dict with 'media_id', 'hash', 'fingerprint' & 'kind' or None
+    stat_cache.update(filename, media_id, file_hash, content_format, fingerprint)
+    stat_cache.save()
+    """
+    FILENAME = '.fansly_scan_cache.json'
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.cache_path = join(directory, self.FILENAME)
+        self.entries = {}
+        self.seen = {}
+        self.lock = threading.Lock()
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def stat_key(stat: os.stat_result):
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def lookup(self, filename: str):
+        try:
+            key = self.stat_key(os.stat(join(self.directory, filename)))
+        except OSError:
+            return None
+        with self.lock:
+            entry = self.entries.get(filename)
+            if entry and entry['stat'] == key:
+                self.seen[filename] = entry
+                return entry
+        return None
+
+    # remember the values extracted from a (re-)processed file; stats are taken after processing, as it might've written metadata into the file
+    def update(self, filename: str, media_id, file_hash, content_format: str, fingerprint: str = None):
+        try:
+            key = self.stat_key(os.stat(join(self.directory, filename)))
+        except OSError:
+            return
+        with self.lock:
+            self.seen[filename] = {'stat': key, 'media_id': media_id, 'hash': file_hash, 'fingerprint': fingerprint, 'kind': content_format}
+
+    def save(self):
+        with self.lock:
+            if self.seen == self.entries:
+                return
+            if write_atomically(self.cache_path, json.dumps(self.seen)):
+                self.entries = dict(self.seen)
+
+
+# exclusively used for extracting media_id & hash from pre-existing files; returns (media_id, file_hash), either being None if not found
+# the filename takes precedence, the Exif metadata is only parsed (once) if it lacks one of them
+# a file, whose metadata can't be parsed (e.g. corrupt or truncated), still keeps what its filename tells
+def extract_media_id_and_hash(filename: str, filepath: str):
+    # if media_id or filehash in filename
+    match = re.search(r'_id_(\d+)', filename)
+    media_id = int(match.group(1)) if match else None
+    match = re.search(r'_hash_([a-fA-F0-9]+)', filename)
+    file_hash = match.group(1) if match else None
+    # if media_id or filehash within Exif metadata
+    if media_id is None or file_hash is None:
+        try:
+            file_metadata = metadata_service.read(filepath).result()
+        except Exception:
+            if media_id is None and file_hash is None:
+                raise
+            return media_id, file_hash
+        if media_id is None:
+            media_id = file_metadata.get('ID')
+        if file_hash is None:
+            file_hash = file_metadata.get('HSH')
+    return media_id, file_hash
+
+# exclusively used for adding hash to pre-existing filenames
+def add_hash_to_filename(filename: str, file_hash: str):
+    base_name, extension = os.path.splitext(filename)
+    hash_suffix = f"_hash_{file_hash}{extension}"
+
+    # adjust filename for 255 bytes filename limit, on all common operating systems
+    max_length = 250
+    if len(base_name) + len(hash_suffix) > max_length:
+        base_name = base_name[:max_length - len(hash_suffix)]
+    
+    return f"{base_name}{hash_suffix}"
+
+# determine the content format (image, video, audio) of a media file by its file extension
+def guess_content_format(filepath: str):
+    mimetype, _ = mimetypes.guess_type(filepath)
+    if mimetype is None:
+        return None
+    content_format = mimetype.split('/')[0]
+    return content_format if content_format in ['image', 'video', 'audio'] else None
+
+# size of each block, that quick_fingerprint() samples from the head, middle & tail of a file
+FINGERPRINT_BLOCK_SIZE = 65_536
+
+# cheap first tier of video & audio deduplication; the file size together with a blake2b hash of three sampled blocks, instead of reading the whole file
+# two files with different fingerprints can't be identical, while two files with the same fingerprint only might be; only those need a full md5_file()
+def quick_fingerprint(filepath: str):
+    size = os.path.getsize(filepath)
+    h = hashlib.blake2b(digest_size = 16)
+    with open(filepath, 'rb') as f:
+        if size <= 3 * FINGERPRINT_BLOCK_SIZE:
+            h.update(f.read())
+        else:
+            for offset in (0, (size - FINGERPRINT_BLOCK_SIZE) // 2, size - FINGERPRINT_BLOCK_SIZE):
+                f.seek(offset)
+                h.update(f.read(FINGERPRINT_BLOCK_SIZE))
+    return f"{size}:{h.hexdigest()}"
+
+# second tier of video & audio deduplication; the md5 of the whole file
+def md5_file(filepath: str):
+    h = hashlib.md5()
+    with open(filepath, 'rb') as f:
+        while (part := f.read(1_048_576)):
+            h.update(part)
+    return h.hexdigest()
+
+# exclusively used for hashing pre-existing media files; pHash for images, videos and audio without a pre-existing md5 only get a quick_fingerprint()
+# a pHash gets written into the files metadata, or its filename if the file extension doesn't support metadata
+# returns the final filepath, media id, hash, fingerprint & a formatted traceback if anything failed; never touches global state, so it's safe to run in a worker process
+def hash_media_file(filepath: str, content_format: str):
+    media_id = None
+    try:
+        filename = os.path.basename(filepath)
+        file_extension = filename.rsplit('.')[1]
+
+        media_id, file_hash = extract_media_id_and_hash(filename, filepath)
+        if not file_hash:
+            if content_format != 'image':
+                # the full md5 of videos and audio is only computed later on, if a download collides with their fingerprint
+                return filepath, media_id, None, quick_fingerprint(filepath), None
+
+            # if image hash doesn't pre-exist, generate one using imagehash
+            with Image.open(filepath) as img:
+                file_hash = str(imagehash.phash(img, hash_size = 16))
+
+            metadata_manager = MetadataManager()
+            ext_sup = metadata_manager.is_file_supported(file_extension)
+            if ext_sup:
+                # if Exif metadata adding is supported for file extension
+                metadata_service.write(filepath, {"HSH": file_hash}).result()
+            else:
+                # else fall back to adding filehash to filename
+                new_filename = add_hash_to_filename(filename, file_hash)
+                new_filepath = join(os.path.dirname(filepath), new_filename)
+                os.rename(filepath, new_filepath)
+                filepath = new_filepath
+
+        return filepath, media_id, file_hash, None, None
+    except FileExistsError:
+        os.remove(filepath)
+        return None, media_id, None, None, None
+    except Exception:
+        return filepath, media_id, None, None, traceback.format_exc()
+
+
+class ScanReport:
+    def __init__(self):
+        self.reused = 0
+        self.processed = 0
+        self.errors = [] # (filepath, content_format, formatted traceback)
+
+
+class LibraryScanner:
+    """
+    What is this?
+    Scans a pre-existing download folder for media files, to re-fill the deduplication variables.
+    The folder is traversed with os.scandir, while every discovered file is immediately handed to a pool of worker processes,
+    so traversal overlaps with the CPU-bound pHash hashing & fingerprinting and a scan isn't limited to a single core by the GIL.
+    Each worker process reads & writes metadata on its own; the thread pool fallback hands all of it to the metadata service, as pyexiv2 isn't thread-safe.
+
+    Worker processes are forked on Linux only; elsewhere the scanner falls back to a thread pool, as macOS system libraries aren't fork-safe & Windows can't fork.
+    Run scans before starting other threads; a forked child only gets the calling thread, but inherits every lock the others were holding.
+    Per-file failures are collected in the returned ScanReport, instead of being silently discarded.
+    With use_manifest, files recorded in their folders manifest are re-used as well & every processed file gets recorded in it.
+
+    Usage:
+    scanner = LibraryScanner(workers = 0, use_stat_cache = True, use_manifest = False) # 0 workers -> one per cpu core
+    report = scanner.scan(folder_path, on_result) # on_result(filepath, content_format, media_id, file_hash, fingerprint) runs in the calling thread
+    """
+    def __init__(self, workers: int = 0, use_stat_cache: bool = True, use_manifest: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_stat_cache = use_stat_cache
+        self.use_manifest = use_manifest
+
+    def _create_executor(self):
+        if sys.platform.startswith('linux'):
+            return concurrent.futures.ProcessPoolExecutor(max_workers = self.workers, mp_context = multiprocessing.get_context('fork'))
+        return concurrent.futures.ThreadPoolExecutor(max_workers = self.workers)
+
+    # walk folder_path depth-first with os.scandir; yields (directory, [file entries]) per directory
+    @staticmethod
+    def _walk(folder_path: str):
+        stack = [folder_path]
+        while stack:
+            directory = stack.pop()
+            files = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks = False):
+                            # hidden directories hold temporary download data, e.g. cached m3u8 segments
+                            if not entry.name.startswith('.'):
+                                stack.append(entry.path)
+                        elif entry.is_file():
+                            files.append(entry)
+            except OSError:
+                continue
+            yield directory, files
+
+    def scan(self, folder_path: str, on_result):
+        report = ScanReport()
+        stat_caches = []
+        pending = {}
+
+        def collect(future):
+            stat_cache, manifest, content_format = pending.pop(future)
+            filepath, media_id, file_hash, fingerprint, error = future.result()
+            report.processed += 1
+            if error:
+                report.errors.append((filepath, content_format, error))
+            if media_id or file_hash or fingerprint:
+                on_result(filepath, content_format, media_id, file_hash, fingerprint)
+            if stat_cache and filepath and not error:
+                stat_cache.update(os.path.basename(filepath), media_id, file_hash, content_format, fingerprint)
+            if manifest and filepath and not error and (media_id or file_hash):
+                manifest.append(os.path.basename(filepath), media_id, file_hash)
+
+        with self._create_executor() as executor:
+            for directory, files in self._walk(folder_path):
+                stat_cache = StatCache(directory) if self.use_stat_cache else None
+                if stat_cache:
+                    stat_caches.append(stat_cache)
+                manifest = manifest_for(directory) if self.use_manifest else None
+
+                for entry in files:
+                    content_format = guess_content_format(entry.path)
+                    if not content_format:
+                        continue
+
+                    # unchanged files since the last scan; just re-use what was extracted from them back then
+                    if stat_cache:
+                        cached = stat_cache.lookup(entry.name)
+                        if cached and cached['kind'] == content_format:
+                            report.reused += 1
+                            on_result(entry.path, content_format, cached['media_id'], cached['hash'], cached.get('fingerprint'))
+                            continue
+
+                    # files recorded in the folders manifest with their hash don't need to be opened at all
+                    if manifest:
+                        recorded = manifest.lookup(entry.name)
+                        if recorded and recorded['hash']:
+                            report.reused += 1
+                            on_result(entry.path, content_format, recorded['media_id'], recorded['hash'], None)
+                            if stat_cache:
+                                stat_cache.update(entry.name, recorded['media_id'], recorded['hash'], content_format)
+                            continue
+
+                    pending[executor.submit(hash_media_file, entry.path, content_format)] = (stat_cache, manifest, content_format)
+
+                    # keep the amount of in-flight files bounded & merge finished ones, while traversal continues
+                    if len(pending) >= self.workers * 4:
+                        done, _ = concurrent.futures.wait(list(pending), return_when = concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            collect(future)
+
+            for future in concurrent.futures.as_completed(list(pending)):
+                collect(future)
+
+        for stat_cache in stat_caches:
+            stat_cache.save()
+        return report
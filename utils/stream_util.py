@@ -0,0 +1,101 @@
+import io, queue, threading, concurrent.futures
+from collections import deque
+
+
+# blocking put into a bounded queue, that gives up once stop_event is set; e.g. after the consumer went away. returns whether item was put
+def put_until_stopped(target_queue: queue.Queue, item, stop_event: threading.Event):
+    while not stop_event.is_set():
+        try:
+            target_queue.put(item, timeout = 0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+class SegmentStream(io.RawIOBase):
+    """
+    What is this?
+    A read-only, non-seekable file-like object over a list of media segments (e.g. the .ts files of a m3u8 playlist).
+    A background thread downloads the segments ahead of the reader with a thread pool and hands their bytes over in playlist order,
+    through a bounded queue; so it can be passed to av.open() and demuxed while the remaining segments are still downloading.
+
+    Memory stays bounded by queue_depth: at most about queue_depth segments are downloading or queued at any time, regardless of the videos length.
+    Any exception raised while fetching a segment is re-raised on the reading side.
+
+    With asynchronous = True, fetch_segment only submits the download (e.g. as coroutine to an event loop) & returns a concurrent.futures.Future of its bytes;
+    then no thread pool is used at all & up to queue_depth segments download at once, without a thread each.
+
+    Usage:
+    with SegmentStream(fetch_segment, segments, workers = 8, queue_depth = 8) as stream:
+        input_container = av.open(stream, format='mpegts')
+    stream = SegmentStream(submit_segment, segments, queue_depth = 32, asynchronous = True)
+    """
+    def __init__(self, fetch_segment, segments: list, workers: int = None, queue_depth: int = 8, on_segment = None, asynchronous: bool = False):
+        super().__init__()
+        self.fetch_segment = fetch_segment # callable; takes a segment, returns its bytes (or a Future of them, if asynchronous)
+        self.asynchronous = asynchronous
+        self.segments = segments
+        self.workers = workers
+        self.queue_depth = max(1, queue_depth)
+        self.on_segment = on_segment # optional callable, invoked after each segment was handed to the reader
+        self.segment_queue = queue.Queue(maxsize = self.queue_depth)
+        self.stop_event = threading.Event()
+        self.current = memoryview(b'')
+        self.finished = False
+        self.feeder = threading.Thread(target = self._feed, daemon = True)
+        self.feeder.start()
+
+    # blocking put, that gives up once the reader was closed
+    def _put(self, item):
+        return put_until_stopped(self.segment_queue, item, self.stop_event)
+
+    def _feed(self):
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers = 1 if self.asynchronous else self.workers) as executor:
+                submit = self.fetch_segment if self.asynchronous else lambda segment: executor.submit(self.fetch_segment, segment)
+                window = deque()
+                for segment in self.segments:
+                    if self.stop_event.is_set():
+                        break
+                    window.append(submit(segment))
+                    # the queue holds downloaded segments; the window the ones still downloading. together they are bounded by queue_depth
+                    if len(window) + self.segment_queue.qsize() >= self.queue_depth:
+                        if not self._put(window.popleft().result()):
+                            break
+                while window and not self.stop_event.is_set():
+                    if not self._put(window.popleft().result()):
+                        break
+                for future in window:
+                    future.cancel()
+            self._put(None) # end of stream
+        except BaseException as e:
+            self._put(e)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def readinto(self, b):
+        while not self.current and not self.finished:
+            item = self.segment_queue.get()
+            if item is None:
+                self.finished = True
+            elif isinstance(item, BaseException):
+                self.finished = True
+                raise item
+            else:
+                self.current = memoryview(item)
+                if self.on_segment:
+                    self.on_segment()
+        if self.finished and not self.current:
+            return 0
+        length = min(len(b), len(self.current))
+        b[:length] = self.current[:length]
+        self.current = self.current[length:]
+        return length
+
+    def close(self):
+        self.stop_event.set()
+        super().close()
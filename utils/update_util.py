@@ -7,6 +7,7 @@ from functools import partialmethod
 import dateutil.parser as dp
 from shutil import unpack_archive
 from configparser import RawConfigParser
+from utils.http_cache import HttpCache
 
 
 # most of the time, we utilize this to display colored output rather than logging or prints
@@ -21,6 +22,18 @@ def output(level: int, log_type: str, color: str, mytext: str):
     log.type(mytext)
 
 
+# the directory of the executable or the fansly_downloader.py script; not necessarily the current working directory
+def program_directory():
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(sys.argv[0]))
+
+
+# responses of the GitHub API & similar, that don't need to be fetched on every start
+http_cache = HttpCache(program_directory())
+RELEASE_CHECK_TTL = 6 * 3600
+
+
 # clear the terminal based on the operating system
 def clear_terminal():
     system = platform.system()
@@ -64,17 +77,18 @@ def apply_old_config_values():
             new_config.write(config_file)
 
 
+# only looks at the programs own directory; never walks into sub-directories, as the download folders might be located there
 def delete_deprecated_files():
     executables = ["old_updater", "updater", "Automatic Configurator", "Fansly Scraper", "deprecated_version", "old_config"]
-    directory = getcwd()
 
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            file_name, file_extension = os.path.splitext(file)
-            if file_extension.lower() != '.py' and file_name in executables:
-                file_path = join(root, file)
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+    try:
+        with os.scandir(program_directory()) as entries:
+            for entry in entries:
+                file_name, file_extension = os.path.splitext(entry.name)
+                if entry.is_file() and file_extension.lower() != '.py' and file_name in executables:
+                    os.remove(entry.path)
+    except OSError:
+        pass
 
 
 def display_release_notes(version_string: str, code_contents: str):
@@ -167,17 +181,12 @@ def handle_update(current_version: str, release: dict):
 
 
 def check_latest_release(update_version: str = 0, current_version: str = 0, intend: str = None): # intend: update / check
-    try:
-        url = f"https://github.com/RalkeyOfficial/fansly-downloade/releases/latest"
-        response = requests.get(url, allow_redirects = True, headers={'user-agent': f'Fansly Downloader {update_version if update_version is not None else current_version}', 'accept-language': 'en-US,en;q=0.9'})
-        response.raise_for_status()
-    except Exception:
-        return False
-    
-    if not response.ok:
+    url = f"https://github.com/RalkeyOfficial/fansly-downloade/releases/latest"
+    # checks re-use the release for a few hours; right after an update, its release notes are always fetched fresh
+    response_json = http_cache.get_json(url, headers={'user-agent': f'Fansly Downloader {update_version if update_version is not None else current_version}', 'accept-language': 'en-US,en;q=0.9'}, ttl = RELEASE_CHECK_TTL if intend == 'check' else 0)
+    if not response_json:
         return False
-    
-    response_json = response.json()
+
     if intend == 'update':
         get_release_description(update_version, response_json)
     elif intend == 'check':